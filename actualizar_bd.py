@@ -0,0 +1,192 @@
+# actualizar_bd.py
+"""Lleva una base de datos existente al esquema actual de modelos.py. Se puede ejecutar varias veces.
+
+Uso: python actualizar_bd.py [--mostrar]
+db.create_all() crea las tablas nuevas (archivo, leases) pero no toca las que ya existen, así que
+este script agrega lo que le falta a esas tablas:
+  1. Columnas nuevas (Ticket.sla_aviso, fecha_actualizacion, descripcion_html/_texto,
+     Comentario.contenido_html/_texto, Usuario.eliminado, fecha_eliminacion) con ALTER TABLE ADD COLUMN.
+  2. Claves foráneas sin el ON DELETE actual (purga.py depende de los CASCADE / SET NULL).
+     En Postgres se recrea la restricción; en SQLite, que no puede alterarlas, se reconstruye la tabla.
+  3. En SQLite, tablas calientes sin AUTOINCREMENT (reutilizaban ids ya archivados): también se
+     reconstruyen, y su secuencia parte después del id más alto del archivo.
+  4. Todos los índices de los modelos (parcial del monitor SLA, prefijos del typeahead, keyset de
+     comentarios, FKs) con CREATE INDEX IF NOT EXISTS, y se borran los que fueron reemplazados
+     (INDICES_OBSOLETOS).
+Con --mostrar solo imprime las sentencias, sin ejecutarlas. Después de actualizar, correr
+rellenar_contenido.py para generar el HTML sanitizado de las filas antiguas.
+"""
+
+import argparse
+from sqlalchemy import inspect, literal, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app import create_app
+from modelos import db, Ticket, Comentario, Notificacion, Adjunto, TicketArchivo, ComentarioArchivo, NotificacionArchivo, AdjuntoArchivo
+
+# Tabla caliente -> tabla de archivo cuyos ids no se deben reutilizar
+ARCHIVO_DE = {
+    Ticket.__table__: TicketArchivo.__table__,
+    Comentario.__table__: ComentarioArchivo.__table__,
+    Notificacion.__table__: NotificacionArchivo.__table__,
+    Adjunto.__table__: AdjuntoArchivo.__table__,
+}
+
+# Índices de versiones anteriores que ya no están en los modelos
+INDICES_OBSOLETOS = [
+    'ix_usuarios_nombre_prefijo',  # lower(nombre): en SQLite solo convertía ASCII; ahora minusculas(nombre)
+    'ix_usuarios_email_prefijo',
+    'ix_usuarios_rut_prefijo',  # rut tal cual: '12345' no encontraba '12.345.678-K'; ahora rut_normalizado(rut)
+]
+
+
+def _valor_defecto(columna, dialecto):
+    """Default escalar del modelo como literal SQL, o NULL (los defaults calculados quedan en NULL)."""
+    if columna.default is None or not columna.default.is_scalar:
+        return 'NULL'
+    return str(literal(columna.default.arg, columna.type).compile(dialect=dialecto, compile_kwargs={'literal_binds': True}))
+
+
+def _ddl_columna(columna, dialecto):
+    """`nombre TIPO [DEFAULT x] [NOT NULL]` para ALTER TABLE ADD COLUMN.
+
+    Las columnas NOT NULL necesitan un DEFAULT en la BD para poder agregarse a tablas con filas.
+    """
+    ddl = f"{dialecto.identifier_preparer.quote(columna.name)} {columna.type.compile(dialect=dialecto)}"
+    if _valor_defecto(columna, dialecto) != 'NULL':
+        ddl += f" DEFAULT {_valor_defecto(columna, dialecto)}"
+    if not columna.nullable:
+        ddl += " NOT NULL"
+    return ddl
+
+
+def _columnas_faltantes(inspector, tabla, dialecto):
+    existentes = {c['name'] for c in inspector.get_columns(tabla.name)}
+    return [f"ALTER TABLE {tabla.name} ADD COLUMN {_ddl_columna(c, dialecto)}"
+            for c in tabla.columns if c.name not in existentes]
+
+
+def _fks_distintas(inspector, tabla):
+    """Claves foráneas del modelo cuyo ON DELETE no coincide con el de la BD: [(fk modelo, fk BD)]."""
+    en_bd = {tuple(fk['constrained_columns']): fk for fk in inspector.get_foreign_keys(tabla.name)}
+    distintas = []
+    for fk in tabla.foreign_key_constraints:
+        actual = en_bd.get(tuple(c.name for c in fk.columns))
+        if actual and (actual['options'].get('ondelete') or '').upper() != (fk.ondelete or '').upper():
+            distintas.append((fk, actual))
+    return distintas
+
+
+def _sin_autoincrement(conexion, tabla):
+    sql = conexion.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :t"), {'t': tabla.name}).scalar()
+    return 'AUTOINCREMENT' not in (sql or '').upper()
+
+
+def _indices_existentes(conexion, tabla):
+    """Nombres de índices de la tabla, incluidos los de expresiones que el inspector de SQLAlchemy omite."""
+    if conexion.dialect.name == 'sqlite':
+        consulta = "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t"
+    else:
+        consulta = "SELECT indexname FROM pg_indexes WHERE tablename = :t"
+    return set(conexion.execute(text(consulta), {'t': tabla.name}).scalars())
+
+
+def _reconstruir_sqlite(inspector, tabla, dialecto):
+    """Procedimiento de SQLite para cambiar la definición de una tabla: copiar a una nueva y renombrar."""
+    copia = db.MetaData()  # Copia aparte para no agregar la tabla temporal a db.metadata
+    for otra in db.metadata.sorted_tables:
+        otra.to_metadata(copia)
+    nueva = tabla.to_metadata(copia, name=f"{tabla.name}_nueva")
+    nueva.indexes.clear()  # Los índices se crean al final con su nombre original
+    existentes = {c['name'] for c in inspector.get_columns(tabla.name)}
+    # Las columnas que faltan se llenan con su valor por defecto en la misma copia
+    valores = [c.name if c.name in existentes else _valor_defecto(c, dialecto) for c in tabla.columns]
+    sentencias = [
+        f"DROP TABLE IF EXISTS {nueva.name}",  # Resto de una ejecución interrumpida
+        str(CreateTable(nueva).compile(dialect=dialecto)).strip(),
+        f"INSERT INTO {nueva.name} ({', '.join(c.name for c in tabla.columns)}) "
+        f"SELECT {', '.join(valores)} FROM {tabla.name}",
+        f"DROP TABLE {tabla.name}",
+        f"ALTER TABLE {nueva.name} RENAME TO {tabla.name}",
+    ]
+    archivo = ARCHIVO_DE.get(tabla)
+    if archivo is not None:
+        sentencias += [
+            f"INSERT INTO sqlite_sequence (name, seq) SELECT '{tabla.name}', 0 "
+            f"WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = '{tabla.name}')",
+            f"UPDATE sqlite_sequence SET seq = MAX(seq, (SELECT COALESCE(MAX(id), 0) FROM {archivo.name})) "
+            f"WHERE name = '{tabla.name}'",
+        ]
+    return sentencias
+
+
+def _recrear_fk_postgres(tabla, fk, actual):
+    columnas = ', '.join(c.name for c in fk.columns)
+    destino = ', '.join(e.column.name for e in fk.elements)
+    return [
+        f"ALTER TABLE {tabla.name} DROP CONSTRAINT {actual['name']}",
+        f"ALTER TABLE {tabla.name} ADD CONSTRAINT {actual['name']} FOREIGN KEY ({columnas}) "
+        f"REFERENCES {fk.referred_table.name} ({destino}) ON DELETE {fk.ondelete or 'NO ACTION'}",
+    ]
+
+
+def sentencias_actualizacion(conexion):
+    """Lista de sentencias SQL que faltan para llegar al esquema de modelos.py."""
+    inspector = inspect(conexion)
+    dialecto = conexion.dialect
+    sqlite = dialecto.name == 'sqlite'
+    nuevas = [t for t in db.metadata.sorted_tables if not inspector.has_table(t.name)]
+    # Primero las tablas nuevas: la reconstrucción de las calientes lee el id máximo del archivo
+    sentencias = [str(CreateTable(tabla).compile(dialect=dialecto)).strip() for tabla in nuevas]
+    sin_indices = set(nuevas)  # Tablas cuyos índices hay que crear todos
+    for tabla in db.metadata.sorted_tables:
+        if tabla in nuevas:
+            continue
+        fks = _fks_distintas(inspector, tabla)
+        if sqlite and (fks or (tabla in ARCHIVO_DE and _sin_autoincrement(conexion, tabla))):
+            sentencias += _reconstruir_sqlite(inspector, tabla, dialecto)  # Ya incluye las columnas nuevas
+            sin_indices.add(tabla)
+        else:
+            sentencias += _columnas_faltantes(inspector, tabla, dialecto)
+            for fk, actual in fks:
+                sentencias += _recrear_fk_postgres(tabla, fk, actual)
+    en_bd = set().union(*(_indices_existentes(conexion, t) for t in db.metadata.sorted_tables if t not in nuevas))
+    sentencias += [f"DROP INDEX IF EXISTS {nombre}" for nombre in INDICES_OBSOLETOS if nombre in en_bd]
+    for tabla in db.metadata.sorted_tables:
+        existentes = set() if tabla in sin_indices else _indices_existentes(conexion, tabla)
+        sentencias += [str(CreateIndex(indice, if_not_exists=True).compile(dialect=dialecto)).strip()
+                       for indice in sorted(tabla.indexes, key=lambda i: i.name) if indice.name not in existentes]
+    return sentencias
+
+
+def run_actualizacion(mostrar=False):
+    app = create_app()
+    with app.app_context():
+        with db.engine.connect() as conexion:
+            sqlite = conexion.dialect.name == 'sqlite'
+            if sqlite:
+                # Fuera de la transacción: SQLite ignora este PRAGMA dentro de una
+                conexion.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            sentencias = sentencias_actualizacion(conexion)
+            print(f"🛠️ {len(sentencias)} sentencias para actualizar el esquema:")
+            for sentencia in sentencias:
+                print(f"   {sentencia};")
+            if mostrar:
+                print("ℹ️ --mostrar: no se ejecutó nada.")
+                return
+            for sentencia in sentencias:
+                conexion.exec_driver_sql(sentencia)
+            if sqlite:
+                errores = conexion.exec_driver_sql("PRAGMA foreign_key_check").fetchall()
+                if errores:
+                    raise RuntimeError(f"Claves foráneas inválidas tras reconstruir tablas: {errores[:10]}")
+            conexion.commit()
+            if sqlite:
+                conexion.exec_driver_sql("PRAGMA foreign_keys=ON")
+    print("✅ Esquema actualizado. Ejecuta rellenar_contenido.py para las filas anteriores a la sanitización.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Agrega columnas, índices y restricciones nuevas a una BD existente.")
+    parser.add_argument('--mostrar', action='store_true', help="Solo imprimir las sentencias SQL")
+    args = parser.parse_args()
+    run_actualizacion(args.mostrar)
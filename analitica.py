@@ -0,0 +1,134 @@
+# analitica.py
+"""Métricas operacionales de tecnico_reportes (MTTR, percentiles, SLA semanal, backlog) con pandas/NumPy."""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from sqlalchemy import or_, union_all
+from modelos import db, Usuario, Categoria, Ticket, TicketArchivo
+
+# --- CACHÉ POR RANGO DE FECHAS ---
+TTL_SEG = int(os.getenv("ANALITICA_TTL", 300))
+MAX_RANGOS = int(os.getenv("ANALITICA_MAX_RANGOS", 64))  # Cada rango distinto de ?desde/?hasta ocupa una entrada
+_cache = OrderedDict()  # (desde, hasta) -> (expira, resultado), del menos al más recientemente usado
+_cache_lock = threading.Lock()
+
+PERCENTILES = [0.5, 0.9]
+
+# --- LÍMITES DEL RANGO (?desde / ?hasta vienen del usuario) ---
+MAX_DIAS = int(os.getenv("ANALITICA_MAX_DIAS", 730))  # Acota el backlog diario y los tickets cargados
+FECHA_MINIMA = datetime(2000, 1, 1)  # pandas no representa fechas antes de 1677 ni después de 2262
+
+
+# Columna de tickets / tickets_archivo -> columna del DataFrame
+COLUMNAS = {'tecnico_id': 'tecnico_id', 'categoria_id': 'categoria_id', 'fecha_creacion': 'creacion',
+            'fecha_cierre': 'cierre', 'fecha_vencimiento_sla': 'vencimiento'}
+
+
+def _cargar_columnas(desde, hasta):
+    """Trae solo las columnas necesarias de los tickets que tocan el rango, como DataFrame.
+
+    SELECT de Core sobre tickets y tickets_archivo, con el filtro dentro de cada tabla de la unión, que
+    pandas lee directo del cursor (sin entidades ORM ni DataFrame.from_records sobre filas).
+    """
+    consultas = [db.select(*(tabla.c[n].label(alias) for n, alias in COLUMNAS.items())).where(
+                     tabla.c.fecha_creacion < hasta, or_(tabla.c.fecha_cierre.is_(None), tabla.c.fecha_cierre >= desde))
+                 for tabla in (Ticket.__table__, TicketArchivo.__table__)]
+    return pd.read_sql(union_all(*consultas), db.session.connection(), parse_dates=['creacion', 'cierre', 'vencimiento'])
+
+
+def _resumen_por_grupo(horas, claves, nombres):
+    """Media y percentiles de horas de resolución agrupadas por claves (id -> nombre)."""
+    if horas.empty:
+        return {'labels': [], 'media': [], 'p50': [], 'p90': []}
+    grupos = horas.groupby(claves)
+    tabla = grupos.quantile(PERCENTILES).unstack()
+    tabla['media'] = grupos.mean()
+    tabla = tabla.sort_values('media').round(1)
+    return {
+        'labels': [nombres.get(k, 'Sin asignar') for k in tabla.index],
+        'media': tabla['media'].tolist(),
+        'p50': tabla[0.5].tolist(),
+        'p90': tabla[0.9].tolist(),
+    }
+
+
+def calcular_metricas(desde, hasta):
+    """Métricas del rango [desde, hasta) sobre tickets activos y archivados."""
+    df = _cargar_columnas(desde, hasta)
+
+    # --- Tiempos de resolución (tickets cerrados dentro del rango) ---
+    cerrados = df[(df['cierre'] >= desde) & (df['cierre'] < hasta)]
+    horas = (cerrados['cierre'] - cerrados['creacion']).dt.total_seconds() / 3600
+    tecnicos = dict(db.session.query(Usuario.id, Usuario.nombre).filter(Usuario.id.in_(cerrados['tecnico_id'].dropna().unique().tolist())).all())
+    categorias = dict(db.session.query(Categoria.id, Categoria.nombre).all())
+
+    # --- Cumplimiento SLA por semana de cierre (tickets sin vencimiento no cuentan, como en el dashboard) ---
+    con_sla = cerrados[cerrados['vencimiento'].notna()]
+    cumplido = (con_sla['cierre'] <= con_sla['vencimiento']).astype(float) * 100
+    semana = con_sla['cierre'].dt.to_period('W').dt.start_time
+    sla = cumplido.groupby(semana).mean().round(1)
+
+    # --- Backlog abierto al final de cada día: creados hasta ese momento menos cerrados hasta ese momento ---
+    dias = pd.date_range(desde, hasta - timedelta(days=1), freq='D')
+    fin_dia = (dias + pd.Timedelta(days=1)).values
+    creados = np.sort(df['creacion'].values)
+    cierres = np.sort(df['cierre'].dropna().values)
+    backlog = np.searchsorted(creados, fin_dia, side='left') - np.searchsorted(cierres, fin_dia, side='left')
+
+    return {
+        'total_cerrados': int(len(cerrados)),
+        'mttr_horas': round(float(horas.mean()), 1) if len(horas) else None,
+        'p90_horas': round(float(horas.quantile(0.9)), 1) if len(horas) else None,
+        'sla_global': round(float(cumplido.mean()), 1) if len(cumplido) else None,
+        'por_tecnico': _resumen_por_grupo(horas, cerrados['tecnico_id'].fillna(0).astype(int), tecnicos),
+        'por_categoria': _resumen_por_grupo(horas, cerrados['categoria_id'], categorias),
+        'sla_semanal': {'labels': [d.strftime('%d-%m-%Y') for d in sla.index], 'data': sla.tolist()},
+        'backlog': {'labels': [d.strftime('%d-%m') for d in dias], 'data': backlog.tolist()},
+    }
+
+
+def metricas_cacheadas(desde, hasta):
+    """calcular_metricas con caché LRU en memoria por rango (hasta MAX_RANGOS) y expiración de TTL_SEG."""
+    clave = (desde, hasta)
+    ahora = time.monotonic()
+    with _cache_lock:
+        guardado = _cache.get(clave)
+        if guardado and guardado[0] > ahora:
+            _cache.move_to_end(clave)
+            return guardado[1]
+    resultado = calcular_metricas(desde, hasta)
+    with _cache_lock:
+        for k in [k for k, (expira, _) in _cache.items() if expira <= ahora]:
+            del _cache[k]
+        _cache[clave] = (ahora + TTL_SEG, resultado)
+        _cache.move_to_end(clave)
+        while len(_cache) > MAX_RANGOS:
+            _cache.popitem(last=False)
+    return resultado
+
+
+def rango_desde_args(args, dias_por_defecto=90):
+    """Lee ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD (hasta inclusive). Devuelve datetimes [desde, hasta).
+
+    `hasta` no pasa de hoy ni baja de FECHA_MINIMA, y el rango se recorta a los últimos MAX_DIAS días.
+    """
+    hoy = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    try:
+        hasta = datetime.strptime(args.get('hasta', ''), '%Y-%m-%d')
+    except ValueError:
+        hasta = hoy
+    try:
+        desde = datetime.strptime(args.get('desde', ''), '%Y-%m-%d')
+    except ValueError:
+        desde = None
+    if desde and desde > hasta:
+        desde, hasta = hasta, desde
+    hasta = min(max(hasta, FECHA_MINIMA), hoy)
+    minimo = max(hasta - timedelta(days=MAX_DIAS - 1), FECHA_MINIMA)
+    desde = min(max(desde or hasta - timedelta(days=dias_por_defecto), minimo), hasta)
+    return desde, hasta + timedelta(days=1)
@@ -0,0 +1,111 @@
+# archivar.py
+"""Mueve tickets cerrados hace tiempo (con sus comentarios, notificaciones y adjuntos) a las tablas de archivo.
+
+Uso: python archivar.py [--dias 180] [--lote 500]
+Cada lote es una transacción independiente, así que el proceso se puede interrumpir y relanzar.
+"""
+
+import os
+import argparse
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, func, text, exists
+from app import create_app
+from modelos import (db, Ticket, Comentario, Notificacion, Adjunto,
+                     TicketArchivo, ComentarioArchivo, NotificacionArchivo, AdjuntoArchivo)
+from monitor_sla import tomar_lease, liberar_lease
+
+# --- CONFIGURACIÓN ---
+DIAS_ARCHIVO = int(os.getenv("ARCHIVO_DIAS", 180))
+LOTE = int(os.getenv("ARCHIVO_LOTE", 500))
+NOMBRE_LEASE = 'archivado_tickets'
+
+# (tabla caliente, tabla de archivo, columna que apunta al ticket). Los tickets van primero
+# al copiar (son el destino de las FK) y últimos al borrar.
+TABLAS = [
+    (Ticket, TicketArchivo, 'id'),
+    (Comentario, ComentarioArchivo, 'ticket_id'),
+    (Notificacion, NotificacionArchivo, 'ticket_id'),
+    (Adjunto, AdjuntoArchivo, 'ticket_id'),
+]
+
+
+def _sin_colision(caliente, archivo, columna):
+    """Condición: ninguna fila de `caliente` de este ticket tiene un id que ya exista en `archivo`.
+
+    Pasa en BDs SQLite creadas antes de sqlite_autoincrement, donde se reutilizaban ids archivados.
+    """
+    origen, destino = caliente.__table__, archivo.__table__
+    return ~exists().where(origen.c[columna] == Ticket.id, destino.c.id == origen.c.id)
+
+
+def archivar_lote(corte, lote=LOTE):
+    """Archiva hasta `lote` tickets cerrados antes de `corte`. Devuelve cuántos movió."""
+    ids = [fila.id for fila in db.session.query(Ticket.id)
+           .filter(Ticket.estado == 'Cerrado', Ticket.fecha_cierre < corte,
+                   *[_sin_colision(caliente, archivo, columna) for caliente, archivo, columna in TABLAS])
+           .order_by(Ticket.id).limit(lote)]
+    if not ids:
+        return 0
+    for caliente, archivo, columna in TABLAS:
+        origen = caliente.__table__
+        nombres = [c.name for c in origen.columns]
+        consulta = select(*[origen.c[n] for n in nombres]).where(origen.c[columna].in_(ids))
+        db.session.execute(archivo.__table__.insert().from_select(nombres, consulta))
+    for caliente, _, columna in reversed(TABLAS):
+        db.session.execute(delete(caliente.__table__).where(caliente.__table__.c[columna].in_(ids)))
+    db.session.commit()
+    return len(ids)
+
+
+def tamano_tablas():
+    """Filas (y bytes en Postgres) de cada tabla caliente."""
+    resultado = {}
+    postgres = db.engine.dialect.name == 'postgresql'
+    for caliente, _, _ in TABLAS:
+        nombre = caliente.__tablename__
+        filas = db.session.query(func.count()).select_from(caliente).scalar()
+        bytes_ = db.session.execute(text("SELECT pg_total_relation_size(:t)"), {'t': nombre}).scalar() if postgres else None
+        resultado[nombre] = (filas, bytes_)
+    return resultado
+
+
+def _imprimir_tamano(titulo, tamanos):
+    print(titulo)
+    for nombre, (filas, bytes_) in tamanos.items():
+        extra = f" ({bytes_ / 1024 / 1024:.1f} MB)" if bytes_ is not None else ""
+        print(f"   🔹 {nombre}: {filas} filas{extra}")
+
+
+def run_archivado(dias=DIAS_ARCHIVO, lote=LOTE):
+    with create_app().app_context():
+        db.create_all()  # Crea las tablas de archivo si aún no existen
+        if not tomar_lease(NOMBRE_LEASE):
+            print("⚠️ Otro proceso está archivando en este momento.")
+            return
+        corte = datetime.utcnow() - timedelta(days=dias)
+        antes = tamano_tablas()
+        _imprimir_tamano(f"📦 Archivando tickets cerrados antes de {corte:%Y-%m-%d}...", antes)
+        total = 0
+        try:
+            while True:
+                movidos = archivar_lote(corte, lote)
+                if not movidos:
+                    break
+                total += movidos
+                tomar_lease(NOMBRE_LEASE)  # Renovamos el lease entre lotes
+                print(f"   ... {total} tickets archivados")
+        finally:
+            db.session.rollback()
+            liberar_lease(NOMBRE_LEASE)  # La próxima ejecución no tiene que esperar a que expire
+        _imprimir_tamano(f"✅ {total} tickets archivados. Tablas calientes ahora:", tamano_tablas())
+        pendientes = db.session.query(Ticket.id).filter(Ticket.estado == 'Cerrado', Ticket.fecha_cierre < corte).count()
+        if pendientes:
+            print(f"⚠️ {pendientes} tickets no se archivaron porque sus ids ya existen en el archivo.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Archiva tickets cerrados antiguos.")
+    parser.add_argument('--dias', type=int, default=DIAS_ARCHIVO, help="Antigüedad mínima del cierre, en días")
+    parser.add_argument('--lote', type=int, default=LOTE, help="Tickets por transacción")
+    args = parser.parse_args()
+    run_archivado(args.dias, args.lote)
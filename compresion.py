@@ -0,0 +1,158 @@
+# compresion.py
+"""Middleware WSGI: compresión gzip/brotli y ETags débiles con respuestas 304 para GET y HEAD."""
+
+import gzip
+import hashlib
+from functools import wraps
+from flask import request, session, Response
+
+try:  # brotli es opcional; sin él solo se usa gzip
+    import brotli
+except ImportError:
+    brotli = None
+
+TIPOS_COMPRIMIBLES = ('text/html', 'text/css', 'text/plain', 'application/json', 'application/javascript')
+MAX_BUFFER = 5 * 1024 * 1024  # Respuestas más grandes pasan sin tocar
+
+# Claves del environ que las rutas pueden poner en False (ver decoradores abajo)
+CLAVE_COMPRIMIR = 'ticketera.comprimir'
+CLAVE_ETAG = 'ticketera.etag'
+
+
+def _acepta(environ, codificacion):
+    for parte in environ.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        nombre, _, params = parte.strip().partition(';')
+        if nombre.strip().lower() == codificacion:
+            return params.replace(' ', '') not in ('q=0', 'q=0.0')
+    return False
+
+
+def _etag_coincide(environ, etag):
+    cabecera = environ.get('HTTP_IF_NONE_MATCH', '')
+    if cabecera.strip() == '*':
+        return True
+    opaco = etag.removeprefix('W/')
+    return any(e.strip().removeprefix('W/') == opaco for e in cabecera.split(','))
+
+
+class CompresionETagMiddleware:
+    """Envuelve app.wsgi_app. Calcula un ETag débil del cuerpo (si la ruta no puso uno), responde 304
+    cuando coincide con If-None-Match y comprime con brotli o gzip sobre `minimo` bytes."""
+
+    def __init__(self, app, minimo=1024, nivel_gzip=6, nivel_brotli=5):
+        self.app = app
+        self.minimo = minimo
+        self.nivel_gzip = nivel_gzip
+        self.nivel_brotli = nivel_brotli
+
+    def __call__(self, environ, start_response):
+        cabeza = environ.get('REQUEST_METHOD') == 'HEAD'
+        if cabeza:
+            # Con HEAD la app entrega el cuerpo vacío: se atiende como GET para que Content-Length, ETag,
+            # Content-Encoding y el 304 sean los del GET, y al final solo se descarta el cuerpo
+            environ = {**environ, 'REQUEST_METHOD': 'GET'}
+        capturado = {'escrito': []}
+
+        def _escribir(dato):
+            if 'escribir' in capturado:  # Respuesta ya pasada sin tocar: write() va directo al servidor
+                capturado['escribir'](dato)
+            else:
+                capturado['escrito'].append(dato)
+
+        def _start_response(status, headers, exc_info=None):
+            capturado.update(status=status, headers=headers, exc_info=exc_info)
+            return _escribir
+
+        app_iter = self.app(environ, _start_response)
+        status, headers = capturado['status'], capturado['headers']
+        cabeceras = {k.lower(): v for k, v in headers}
+        tipo = cabeceras.get('content-type', '').split(';')[0].strip()
+        procesable = (
+            status.startswith('200')
+            and tipo in TIPOS_COMPRIMIBLES
+            and 'content-encoding' not in cabeceras
+            and int(cabeceras.get('content-length') or 0) <= MAX_BUFFER
+            and not capturado.get('escrito')
+        )
+        if not procesable:
+            escribir = start_response(status, headers, capturado['exc_info'])
+            if cabeza:  # Sin cuerpo: ni lo escrito con write() ni el iterable
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+                return []
+            # Lo que la app mandó con write() antes de devolver el iterable va primero (PEP 3333)
+            for dato in capturado['escrito']:
+                escribir(dato)
+            capturado['escribir'] = escribir
+            return app_iter
+
+        partes = capturado['escrito']  # write() durante la iteración queda en orden con el resto
+        try:
+            for parte in app_iter:
+                partes.append(parte)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+        cuerpo = b''.join(partes)
+        headers = [(k, v) for k, v in headers if k.lower() != 'content-length']
+
+        # --- ETag débil + 304 ---
+        if environ['REQUEST_METHOD'] == 'GET' and environ.get(CLAVE_ETAG, True):
+            etag = cabeceras.get('etag')
+            if etag is None:
+                etag = 'W/"%s"' % hashlib.blake2b(cuerpo, digest_size=16).hexdigest()
+                headers.append(('ETag', etag))
+            if _etag_coincide(environ, etag):
+                omitir = ('content-type', 'content-encoding')
+                start_response('304 Not Modified', [(k, v) for k, v in headers if k.lower() not in omitir])
+                return []
+
+        # --- Compresión ---
+        if environ.get(CLAVE_COMPRIMIR, True) and len(cuerpo) >= self.minimo:
+            if brotli is not None and _acepta(environ, 'br'):
+                cuerpo = brotli.compress(cuerpo, quality=self.nivel_brotli)
+                headers.append(('Content-Encoding', 'br'))
+            elif _acepta(environ, 'gzip'):
+                cuerpo = gzip.compress(cuerpo, compresslevel=self.nivel_gzip)
+                headers.append(('Content-Encoding', 'gzip'))
+            vary = cabeceras.get('vary')
+            headers = [(k, v) for k, v in headers if k.lower() != 'vary']
+            headers.append(('Vary', f"{vary}, Accept-Encoding" if vary else 'Accept-Encoding'))
+
+        headers.append(('Content-Length', str(len(cuerpo))))
+        start_response(status, headers)
+        return [] if cabeza else [cuerpo]
+
+
+# --- OPCIONES POR RUTA ---
+def sin_compresion(f):
+    """La respuesta de esta ruta no se comprime (descargas, archivos ya comprimidos)."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        request.environ[CLAVE_COMPRIMIR] = False
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def sin_etag(f):
+    """La respuesta de esta ruta no lleva ETag ni responde 304."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        request.environ[CLAVE_ETAG] = False
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def etag_por_version(*partes):
+    """ETag débil a partir de una versión barata del recurso (p. ej. usuario + max(fecha_actualizacion))."""
+    return 'W/"%s"' % hashlib.blake2b(repr(partes).encode(), digest_size=16).hexdigest()
+
+
+def no_modificado(etag):
+    """Respuesta 304 si el cliente ya tiene `etag`, para cortar antes de renderizar; si no, None.
+
+    Con mensajes flash pendientes no se corta: el cuerpo cambiaría aunque los datos no.
+    """
+    if session.get('_flashes') or not request.if_none_match.contains_weak(etag.removeprefix('W/').strip('"')):
+        return None
+    return Response(status=304, headers={'ETag': etag, 'Cache-Control': 'private, no-cache'})
@@ -0,0 +1,133 @@
+# contenido.py
+"""Sanitización por lista blanca del HTML de Summernote y su versión en texto plano.
+
+Se ejecuta una sola vez al escribir (ver los eventos en modelos.py); las vistas leen la columna ya limpia.
+"""
+
+import re
+from html import escape
+from html.parser import HTMLParser
+
+# --- LISTA BLANCA (lo que produce la barra de herramientas de Summernote) ---
+ETIQUETAS_PERMITIDAS = {
+    'p', 'br', 'b', 'strong', 'i', 'em', 'u', 'span', 'div', 'font', 'blockquote', 'pre', 'code',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'a', 'img',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td', 'hr',
+}
+ETIQUETAS_VACIAS = {'br', 'img', 'hr'}
+ETIQUETAS_DESCARTAR_CONTENIDO = {'script', 'style', 'iframe', 'object', 'embed', 'noscript', 'template', 'svg', 'math'}
+ATRIBUTOS_PERMITIDOS = {
+    '*': {'style'},
+    'a': {'href', 'title', 'target'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'font': {'color'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+ESQUEMAS_URL = ('http:', 'https:', 'mailto:')
+PROPIEDADES_CSS = {'color', 'background-color', 'font-weight', 'font-style', 'text-decoration',
+                   'text-align', 'width', 'height', 'float', 'margin-left'}
+_VALOR_CSS_SEGURO = re.compile(r'^[#\w\s.,%-]+$')  # Sin paréntesis: nada de expression(), var(), calc()...
+_COLOR_RGB = re.compile(r'\brgba?\(\s*[\d.\s,%]+\)', re.IGNORECASE)  # Única función CSS permitida
+_IMAGEN_DATA = re.compile(r'^data:image/(png|jpe?g|gif|webp);base64,[A-Za-z0-9+/=\s]+$')
+BLOQUES = {'p', 'div', 'br', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'hr'}
+
+
+def _url_segura(valor, etiqueta):
+    valor = valor.strip()
+    compacto = re.sub(r'[\x00-\x20]', '', valor).lower()
+    if etiqueta == 'img' and compacto.startswith('data:'):
+        return _IMAGEN_DATA.match(valor) is not None  # Summernote inserta imágenes en base64
+    if ':' not in compacto.split('/', 1)[0]:
+        return True  # URL relativa
+    return compacto.startswith(ESQUEMAS_URL)
+
+
+def _estilo_seguro(valor):
+    declaraciones = []
+    for declaracion in valor.split(';'):
+        propiedad, _, contenido = declaracion.partition(':')
+        propiedad, contenido = propiedad.strip().lower(), contenido.strip()
+        if propiedad in PROPIEDADES_CSS and contenido and _VALOR_CSS_SEGURO.match(_COLOR_RGB.sub('0', contenido)) and 'url' not in contenido.lower():
+            declaraciones.append(f"{propiedad}: {contenido}")
+    return '; '.join(declaraciones)
+
+
+class _Sanitizador(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.texto = []
+        self.abiertas = []
+        self.descartando = 0
+
+    def handle_starttag(self, etiqueta, atributos):
+        if etiqueta in ETIQUETAS_DESCARTAR_CONTENIDO:
+            self.descartando += 1
+            return
+        if self.descartando:
+            return
+        if etiqueta in BLOQUES:
+            self.texto.append('\n')
+        if etiqueta not in ETIQUETAS_PERMITIDAS:
+            return
+        permitidos = ATRIBUTOS_PERMITIDOS['*'] | ATRIBUTOS_PERMITIDOS.get(etiqueta, set())
+        limpios = []
+        for nombre, valor in atributos:
+            if nombre not in permitidos or valor is None:
+                continue
+            if nombre in ('href', 'src') and not _url_segura(valor, etiqueta):
+                continue
+            if nombre == 'style':
+                valor = _estilo_seguro(valor)
+                if not valor:
+                    continue
+            if nombre == 'target' and valor != '_blank':
+                continue
+            limpios.append(f' {nombre}="{escape(valor, quote=True)}"')
+        if etiqueta == 'a' and any(a.startswith(' target=') for a in limpios):
+            limpios.append(' rel="noopener noreferrer"')
+        self.html.append(f"<{etiqueta}{''.join(limpios)}>")
+        if etiqueta not in ETIQUETAS_VACIAS:
+            self.abiertas.append(etiqueta)
+
+    def handle_startendtag(self, etiqueta, atributos):
+        if etiqueta in ETIQUETAS_DESCARTAR_CONTENIDO:
+            return  # <script/> no tiene contenido ni cierre: no debe abrir un bloque descartado
+        self.handle_starttag(etiqueta, atributos)
+        if etiqueta not in ETIQUETAS_VACIAS and self.abiertas and self.abiertas[-1] == etiqueta:
+            self.handle_endtag(etiqueta)
+
+    def handle_endtag(self, etiqueta):
+        if etiqueta in ETIQUETAS_DESCARTAR_CONTENIDO:
+            self.descartando = max(0, self.descartando - 1)
+            return
+        if self.descartando or etiqueta not in self.abiertas:
+            return
+        # Cierra también las etiquetas que quedaron abiertas dentro (HTML mal formado)
+        while self.abiertas:
+            abierta = self.abiertas.pop()
+            self.html.append(f"</{abierta}>")
+            if abierta == etiqueta:
+                break
+
+    def handle_data(self, datos):
+        if not self.descartando:
+            self.html.append(escape(datos, quote=False))
+            self.texto.append(datos)
+
+    def resultado(self):
+        self.close()
+        html = ''.join(self.html) + ''.join(f"</{e}>" for e in reversed(self.abiertas))
+        texto = re.sub(r'[ \t\r\f\v\xa0]+', ' ', ''.join(self.texto))
+        texto = re.sub(r'\s*\n\s*', '\n', texto).strip()
+        return html, texto
+
+
+def procesar_html(html):
+    """Devuelve (html_seguro, texto_plano) a partir del HTML enviado por el usuario."""
+    if not html:
+        return '', ''
+    sanitizador = _Sanitizador()
+    sanitizador.feed(html)
+    return sanitizador.resultado()
@@ -0,0 +1,96 @@
+# directorio.py
+"""Búsqueda tipo typeahead de usuarios por prefijo de nombre, RUT o email.
+
+Reemplaza los <select> que cargaban a todos los usuarios en cada página. Las consultas usan los
+índices de prefijo de Usuario (ver modelos.py) y los prefijos frecuentes quedan en una caché LRU
+con TTL: si un prefijo ya trajo todos sus resultados, los prefijos más largos se filtran en memoria.
+"""
+
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from sqlalchemy import or_
+from modelos import db, Usuario, minusculas, rut_normalizado
+
+# --- CONFIGURACIÓN ---
+TTL_SEG = int(os.getenv("DIRECTORIO_TTL", 60))
+MAX_PREFIJOS = int(os.getenv("DIRECTORIO_MAX_PREFIJOS", 1000))
+LIMITE_POR_DEFECTO = 10
+LIMITE_MAXIMO = 25
+ROLES = ('Usuario', 'Técnico Nivel 1', 'Técnico Nivel 2')
+
+_cache = OrderedDict()  # (prefijo, roles, limite) -> (expira, filas, completo)
+_cache_lock = threading.Lock()
+
+
+def _escapar_like(texto):
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _normalizar_rut(texto):
+    """Lo mismo que rut_normalizado() en SQL: sin puntos ni guion y en mayúsculas."""
+    return re.sub(r'[.\-]', '', texto).upper()
+
+
+def _coincide(fila, prefijo):
+    rut = _normalizar_rut(prefijo)
+    return fila['nombre'].lower().startswith(prefijo) or fila['email'].lower().startswith(prefijo) \
+        or bool(rut) and _normalizar_rut(fila['rut']).startswith(rut)
+
+
+def _consultar(prefijo, roles, limite):
+    patron = _escapar_like(prefijo) + '%'
+    condiciones = [minusculas(Usuario.nombre).like(patron, escape='\\'),
+                   minusculas(Usuario.email).like(patron, escape='\\')]
+    rut = _normalizar_rut(prefijo)
+    if rut:  # '12345' y '12.345' encuentran '12.345.678-K'
+        condiciones.append(rut_normalizado(Usuario.rut).like(_escapar_like(rut) + '%', escape='\\'))
+    query = db.session.query(Usuario.id, Usuario.nombre, Usuario.rut, Usuario.email, Usuario.rol).filter(
+        Usuario.eliminado.is_(False), or_(*condiciones))
+    if roles:
+        query = query.filter(Usuario.rol.in_(roles))
+    # Se pide uno más para saber si el resultado quedó completo (sirve para filtrar prefijos más largos)
+    filas = query.order_by(Usuario.nombre, Usuario.id).limit(limite + 1).all()
+    return [dict(f._mapping) for f in filas[:limite]], len(filas) <= limite
+
+
+def _desde_cache(prefijo, roles, limite, ahora):
+    """Resultado de la caché para el prefijo o para un prefijo más corto que ya vino completo."""
+    for largo in range(len(prefijo), -1, -1):
+        guardado = _cache.get((prefijo[:largo], roles, limite))
+        if not guardado or guardado[0] <= ahora:
+            continue
+        _, filas, completo = guardado
+        if largo == len(prefijo):
+            _cache.move_to_end((prefijo, roles, limite))
+            return filas
+        if completo:
+            return [f for f in filas if _coincide(f, prefijo)]
+    return None
+
+
+def buscar_usuarios(texto, roles=None, limite=LIMITE_POR_DEFECTO):
+    """Hasta `limite` usuarios activos cuyo nombre, RUT o email empieza con `texto`, ordenados por nombre."""
+    prefijo = (texto or '').strip().lower()[:100]
+    roles = tuple(sorted(r for r in (roles or ()) if r in ROLES))
+    limite = min(max(int(limite), 1), LIMITE_MAXIMO)
+    ahora = time.monotonic()
+    with _cache_lock:
+        filas = _desde_cache(prefijo, roles, limite, ahora)
+    if filas is not None:
+        return filas
+    filas, completo = _consultar(prefijo, roles, limite)
+    with _cache_lock:
+        _cache[(prefijo, roles, limite)] = (ahora + TTL_SEG, filas, completo)
+        _cache.move_to_end((prefijo, roles, limite))
+        while len(_cache) > MAX_PREFIJOS:
+            _cache.popitem(last=False)
+    return filas
+
+
+def invalidar_directorio():
+    """Vacía la caché; se llama al crear, editar o eliminar usuarios."""
+    with _cache_lock:
+        _cache.clear()
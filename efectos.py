@@ -0,0 +1,126 @@
+# efectos.py
+"""Efectos secundarios post-commit (notificaciones, auditoría, asignaciones, correos futuros).
+
+Las rutas llaman a encolar_efecto() dentro de su transacción; los efectos solo se ejecutan si
+esa transacción hace commit, en un pool de hilos acotado y fuera de la latencia del request.
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import current_app
+from sqlalchemy import event
+
+# --- CONFIGURACIÓN ---
+EFECTOS_WORKERS = int(os.getenv("EFECTOS_WORKERS", 4))
+EFECTOS_MAX_PENDIENTES = int(os.getenv("EFECTOS_MAX_PENDIENTES", 1000))
+EFECTOS_REINTENTOS = int(os.getenv("EFECTOS_REINTENTOS", 3))
+EFECTOS_TIMEOUT_DRENADO = float(os.getenv("EFECTOS_TIMEOUT_DRENADO", 30))
+MAX_CLAVES_RECORDADAS = 10000
+
+_executor = ThreadPoolExecutor(max_workers=EFECTOS_WORKERS, thread_name_prefix='efectos')
+_cupos = threading.BoundedSemaphore(EFECTOS_MAX_PENDIENTES)
+_en_vuelo = set()
+_cerrado = False
+_lock = threading.Lock()
+_claves = OrderedDict()  # Claves de idempotencia ya despachadas (LRU acotado)
+
+
+def encolar_efecto(funcion, *args, clave=None, **kwargs):
+    """Programa funcion(*args, **kwargs) para después del próximo commit de db.session.
+
+    La función corre con su propio app context y sesión; se hace commit al terminar.
+    Si se pasa `clave`, un efecto con la misma clave no se ejecuta dos veces.
+    """
+    db = current_app.extensions['sqlalchemy']
+    pendientes = db.session.info.setdefault('efectos_pendientes', [])
+    pendientes.append((current_app._get_current_object(), funcion, args, kwargs, clave))
+
+
+def instalar_efectos(db):
+    """Conecta el despacho de efectos a los eventos de la sesión de Flask-SQLAlchemy.
+
+    Cada create_app() la llama; los listeners se registran una sola vez por proceso.
+    """
+    if event.contains(db.session, 'after_commit', _despachar):
+        return
+    event.listen(db.session, 'after_commit', _despachar)
+    event.listen(db.session, 'after_rollback', _descartar)
+
+
+def _descartar(session):
+    session.info.pop('efectos_pendientes', None)
+
+
+def _reservar_clave(clave):
+    if clave is None:
+        return True
+    with _lock:
+        if clave in _claves:
+            return False
+        _claves[clave] = True
+        if len(_claves) > MAX_CLAVES_RECORDADAS:
+            _claves.popitem(last=False)
+        return True
+
+
+def _liberar_clave(clave):
+    if clave is not None:
+        with _lock:
+            _claves.pop(clave, None)
+
+
+def _despachar(session):
+    for app, funcion, args, kwargs, clave in session.info.pop('efectos_pendientes', []):
+        if not _reservar_clave(clave):
+            continue
+        with _lock:
+            disponible = not _cerrado and _cupos.acquire(blocking=False)
+            if disponible:
+                futuro = _executor.submit(_ejecutar, app, funcion, args, kwargs, clave)
+                _en_vuelo.add(futuro)
+        if disponible:
+            futuro.add_done_callback(_terminar)
+        else:
+            # Cola llena o apagándose: se ejecuta en línea para no perder el efecto
+            _ejecutar(app, funcion, args, kwargs, clave)
+
+
+def _terminar(futuro):
+    with _lock:
+        _en_vuelo.discard(futuro)
+    _cupos.release()
+
+
+def _ejecutar(app, funcion, args, kwargs, clave):
+    for intento in range(1, EFECTOS_REINTENTOS + 1):
+        with app.app_context():
+            db = app.extensions['sqlalchemy']
+            try:
+                funcion(*args, **kwargs)
+                db.session.commit()
+                return
+            except Exception:
+                db.session.rollback()
+                if intento == EFECTOS_REINTENTOS:
+                    logging.exception(f"Efecto {funcion.__name__} falló tras {intento} intentos")
+                    _liberar_clave(clave)
+                    return
+        time.sleep(0.5 * 2 ** (intento - 1))
+
+
+def drenar_efectos(timeout=EFECTOS_TIMEOUT_DRENADO):
+    """Deja de aceptar efectos en el pool y espera a que terminen los pendientes (al apagar)."""
+    global _cerrado
+    with _lock:
+        _cerrado = True
+        pendientes = list(_en_vuelo)
+    wait(pendientes, timeout=timeout)
+    _executor.shutdown(wait=False)
+
+
+atexit.register(drenar_efectos)
@@ -0,0 +1,71 @@
+# medicion.py
+"""Utilidades comunes de los scripts medir_*.py (benchmarks que se ejecutan a mano, como seed.py).
+
+Por defecto cada medición usa una BD SQLite temporal para no tocar la real; con
+MEDICION_DATABASE_URL se puede apuntar a un Postgres de pruebas.
+"""
+
+import os
+import time
+import tempfile
+from contextlib import contextmanager
+from werkzeug.security import generate_password_hash
+
+PASSWORD = '1234'
+
+
+@contextmanager
+def app_temporal(**config):
+    """App de create_app() sobre una BD vacía, con app context activo y tablas creadas."""
+    from app import create_app
+    from modelos import db
+    carpeta = tempfile.mkdtemp(prefix='ticketera-medicion-')
+    uri = os.getenv("MEDICION_DATABASE_URL") or f"sqlite:///{os.path.join(carpeta, 'medicion.db')}"
+    app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'TESTING': True, **config})
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        try:
+            yield app
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+
+def crear_base(cantidad_usuarios=1, metodo_hash='pbkdf2:sha256:1000'):
+    """Categoría, un técnico N1, un N2 y `cantidad_usuarios` usuarios finales. Devuelve (categoria, tecnicos, usuarios)."""
+    from modelos import db, Usuario, Categoria
+    password = generate_password_hash(PASSWORD, method=metodo_hash)
+    categoria = Categoria(nombre='General', descripcion='Medición', sla_respuesta=2, sla_resolucion=8)
+    tecnicos = [Usuario(rut=f'9.000.00{n}-K', nombre=f'Técnico {n}', email=f'tecnico{n}@medicion.cl', password=password, rol=rol)
+                for n, rol in enumerate(('Técnico Nivel 1', 'Técnico Nivel 2'))]
+    usuarios = [Usuario(rut=f'{10_000_000 + n}-0', nombre=f'Usuario {n}', email=f'usuario{n}@medicion.cl', password=password)
+                for n in range(cantidad_usuarios)]
+    db.session.add_all([categoria, *tecnicos, *usuarios])
+    db.session.commit()
+    return categoria, tecnicos, usuarios
+
+
+def iniciar_sesion(cliente, usuario):
+    respuesta = cliente.post('/', data={'rut': usuario.rut, 'password': PASSWORD})
+    assert respuesta.status_code == 302, f"Login falló ({respuesta.status_code})"
+
+
+def cronometrar(funcion, repeticiones):
+    """Duraciones en milisegundos de `repeticiones` llamadas a funcion()."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def resumen(titulo, tiempos):
+    print(f"   🔹 {titulo}: p50 {percentil(tiempos, 50):.2f} ms · p99 {percentil(tiempos, 99):.2f} ms · "
+          f"media {sum(tiempos) / len(tiempos):.2f} ms ({len(tiempos)} muestras)")
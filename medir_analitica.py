@@ -0,0 +1,94 @@
+# medir_analitica.py
+"""Benchmark de las métricas de tecnico_reportes sobre un volumen grande de tickets.
+
+Uso: python medir_analitica.py [--tickets 1000000] [--repeticiones 5]
+Genera tickets repartidos en los últimos 3 años (los cerrados hace más de 180 días van a
+tickets_archivo, como después de archivar.py) y mide calcular_metricas para distintos rangos,
+la respuesta cacheada y el render completo de /tecnico/reportes.
+"""
+
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from medicion import app_temporal, crear_base, iniciar_sesion, cronometrar, resumen
+
+LOTE_INSERCION = 20_000
+
+
+def _generar_tickets(cantidad, categoria_id, usuario_id, tecnicos, ahora):
+    """Inserta `cantidad` tickets con SQL directo (sin ORM) en lotes. Devuelve (calientes, archivados)."""
+    from modelos import db, Ticket, TicketArchivo
+    corte_archivo = ahora - timedelta(days=180)
+    calientes, archivados = [], []
+    contadores = [0, 0]
+    rng = random.Random(42)
+
+    def volcar(filas, tabla, indice):
+        if filas:
+            db.session.execute(tabla.insert(), filas)
+            db.session.commit()
+            contadores[indice] += len(filas)
+            filas.clear()
+
+    for n in range(1, cantidad + 1):
+        creacion = ahora - timedelta(minutes=rng.randrange(3 * 365 * 24 * 60))
+        cierre = creacion + timedelta(hours=rng.expovariate(1 / 24)) if rng.random() < 0.9 else None
+        if cierre and cierre > ahora:
+            cierre = None
+        fila = {
+            'id': n, 'asunto': f'Ticket {n}', 'descripcion': 'Medición', 'estado': 'Cerrado' if cierre else 'Abierto',
+            'prioridad': 'Media', 'fecha_creacion': creacion, 'fecha_cierre': cierre,
+            # Algunos tickets antiguos no tienen vencimiento: no deben contar en el cumplimiento SLA
+            'fecha_vencimiento_sla': creacion + timedelta(hours=24) if rng.random() < 0.95 else None,
+            'es_sla_extendido': False, 'sla_aviso': 0, 'usuario_id': usuario_id,
+            'tecnico_id': rng.choice(tecnicos), 'categoria_id': categoria_id,
+        }
+        if cierre and cierre < corte_archivo:
+            archivados.append(fila)
+        else:
+            calientes.append(fila)
+        if len(archivados) >= LOTE_INSERCION:
+            volcar(archivados, TicketArchivo.__table__, 1)
+        if len(calientes) >= LOTE_INSERCION:
+            volcar(calientes, Ticket.__table__, 0)
+    volcar(archivados, TicketArchivo.__table__, 1)
+    volcar(calientes, Ticket.__table__, 0)
+    return tuple(contadores)
+
+
+def run_medicion(tickets=1_000_000, repeticiones=5):
+    import analitica
+    with app_temporal() as app:
+        categoria, tecnicos, (usuario,) = crear_base()
+        ahora = datetime.utcnow()
+        print(f"🎫 Generando {tickets} tickets...")
+        inicio = time.perf_counter()
+        calientes, archivados = _generar_tickets(tickets, categoria.id, usuario.id, [t.id for t in tecnicos], ahora)
+        print(f"   {calientes} en tickets, {archivados} en tickets_archivo ({time.perf_counter() - inicio:.0f} s)")
+
+        hasta = ahora.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        print(f"⏱️ {repeticiones} cálculos por rango (sin caché):")
+        for dias in (30, 90, 365, analitica.MAX_DIAS):
+            resumen(f"calcular_metricas {dias} días",
+                    cronometrar(lambda: analitica.calcular_metricas(hasta - timedelta(days=dias), hasta), repeticiones))
+        analitica.metricas_cacheadas(hasta - timedelta(days=90), hasta)  # Llena la caché
+        resumen("metricas_cacheadas 90 días (acierto)",
+                cronometrar(lambda: analitica.metricas_cacheadas(hasta - timedelta(days=90), hasta), repeticiones))
+
+        cliente = app.test_client()
+        iniciar_sesion(cliente, tecnicos[1])
+        url = '/tecnico/reportes?desde=0001-01-01&hasta=9999-12-31'
+        respuesta = cliente.get(url)  # Antes: OverflowError (500); ahora el rango se recorta a MAX_DIAS
+        assert respuesta.status_code == 200, f"Reportes falló ({respuesta.status_code})"
+        resumen("GET /tecnico/reportes con rango fuera de límites (caché de métricas llena)",
+                cronometrar(lambda: cliente.get(url), repeticiones))
+    print("✅ Medición terminada.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mide las métricas de reportes con muchos tickets.")
+    parser.add_argument('--tickets', type=int, default=1_000_000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+    run_medicion(args.tickets, args.repeticiones)
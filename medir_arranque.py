@@ -0,0 +1,74 @@
+# medir_arranque.py
+"""Benchmark del arranque de un worker: tiempo de import, memoria y módulos pesados cargados.
+
+Uso: python medir_arranque.py [--repeticiones 5]
+Cada medición corre en un proceso nuevo (python -X importtime) que solo llama a create_app().
+Falla si pandas, numpy, requests o scipy quedan cargados: se importan recién al usarlos
+(reportes, analítica, sugerencias, feriados). Como referencia, mide también un proceso que
+además carga esos módulos, que es lo que costaba arrancar antes de separarlos.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from medicion import percentil
+
+PESADOS = ('pandas', 'numpy', 'requests', 'scipy')
+
+# Se ejecuta en el proceso hijo; imprime una línea JSON con lo medido
+CODIGO = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+from app import create_app
+create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+%s
+print(json.dumps({
+    'ms': (time.perf_counter() - inicio) * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'pesados': sorted(m for m in %r if m in sys.modules),
+}))
+"""
+
+
+def _medir_proceso(extra=''):
+    """Corre un proceso hijo y devuelve (medición, ms de import según -X importtime)."""
+    resultado = subprocess.run([sys.executable, '-X', 'importtime', '-c', CODIGO % (extra, PESADOS)],
+                               cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True,
+                               env={**os.environ, 'SLA_MONITOR_ACTIVO': '0'}, check=True)
+    medicion = json.loads(resultado.stdout.strip().splitlines()[-1])
+    # Líneas "import time: self | cumulative | módulo"; los módulos de primer nivel no tienen sangría
+    import_us = sum(int(linea.split('|')[1]) for linea in resultado.stderr.splitlines()
+                    if linea.startswith('import time:') and linea.split('|')[1].strip().isdigit()
+                    and not linea.split('|')[2].startswith('  '))
+    return medicion, import_us / 1000
+
+
+def _resumen(titulo, muestras):
+    ms = [m['ms'] for m, _ in muestras]
+    imports = [i for _, i in muestras]
+    rss = [m['rss_mb'] for m, _ in muestras]
+    print(f"   🔹 {titulo}: arranque p50 {percentil(ms, 50):.0f} ms · imports p50 {percentil(imports, 50):.0f} ms · "
+          f"RSS máx p50 {percentil(rss, 50):.1f} MB ({len(muestras)} procesos)")
+
+
+def run_medicion(repeticiones=5):
+    print(f"⏱️ {repeticiones} arranques en procesos nuevos:")
+    muestras = [_medir_proceso() for _ in range(repeticiones)]
+    _resumen("create_app()", muestras)
+    cargados = sorted({m for medicion, _ in muestras for m in medicion['pesados']})
+    referencia = [_medir_proceso('import analitica, sugerencias, pandas, requests') for _ in range(repeticiones)]
+    _resumen("create_app() + módulos pesados (referencia)", referencia)
+    if cargados:
+        print(f"❌ create_app() cargó módulos que deberían ser diferidos: {', '.join(cargados)}")
+        return False
+    print(f"✅ Ninguno de {', '.join(PESADOS)} se carga al arrancar.")
+    return True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mide tiempo de arranque y memoria de create_app().")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(0 if run_medicion(args.repeticiones) else 1)
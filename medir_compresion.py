@@ -0,0 +1,66 @@
+# medir_compresion.py
+"""Benchmark de CompresionETagMiddleware: bytes transferidos y latencia en un enlace lento.
+
+Uso: python medir_compresion.py [--kbps 1600] [--rtt 150] [--repeticiones 50]
+Pide páginas típicas sin compresión, con gzip, con brotli (si está instalado) y revalidando con
+If-None-Match. La latencia del enlace se simula a partir de lo medido:
+    tiempo servidor + RTT + bytes * 8 / ancho de banda
+(por defecto ~1.6 Mbps y 150 ms de RTT, como el perfil "3G rápido" de los navegadores).
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from medicion import app_temporal, crear_base, iniciar_sesion, cronometrar, percentil
+
+COMENTARIOS = 60
+COMENTARIO_HTML = ('<p>Revisé el equipo y el problema persiste. Reinicié el servicio, limpié la caché y '
+                   'probé con <a href="https://soporte.ticketera.cl/kb/42">el artículo 42</a>.</p>')
+
+
+def _crear_datos():
+    from modelos import db, Ticket, Comentario
+    categoria, (tecnico, tecnico_n2), usuarios = crear_base(cantidad_usuarios=30)
+    ahora = datetime.utcnow()
+    tickets = [Ticket(asunto=f'Problema {n} con el correo', descripcion=COMENTARIO_HTML, usuario_id=usuarios[n % 30].id,
+                      tecnico_id=tecnico.id, categoria_id=categoria.id, estado='En Proceso',
+                      fecha_vencimiento_sla=ahora + timedelta(hours=n)) for n in range(40)]
+    db.session.add_all(tickets)
+    db.session.flush()
+    db.session.add_all(Comentario(contenido=COMENTARIO_HTML, ticket_id=tickets[0].id, usuario_id=tecnico.id)
+                       for _ in range(COMENTARIOS))
+    db.session.commit()
+    return tecnico_n2, tickets[0].id
+
+
+def run_medicion(kbps=1600, rtt=150, repeticiones=50):
+    from compresion import brotli
+    with app_temporal() as app:
+        tecnico, ticket_id = _crear_datos()
+        cliente = app.test_client()
+        iniciar_sesion(cliente, tecnico)
+        paginas = ['/tecnico/todos', f'/ticket/{ticket_id}', '/tecnico/usuarios/buscar?q=usu&limite=25']
+        codificaciones = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+
+        print(f"⏱️ Enlace simulado de {kbps} kbps y {rtt} ms de RTT, {repeticiones} requests por caso:")
+        for pagina in paginas:
+            print(f"   📄 {pagina}")
+            for codificacion in codificaciones + ['304']:
+                cabeceras = {'Accept-Encoding': 'gzip' if codificacion == '304' else codificacion}
+                if codificacion == '304':
+                    cabeceras['If-None-Match'] = cliente.get(pagina, headers=cabeceras).headers['ETag']
+                respuesta = cliente.get(pagina, headers=cabeceras)
+                transferidos = len(respuesta.get_data())
+                servidor = percentil(cronometrar(lambda: cliente.get(pagina, headers=cabeceras), repeticiones), 50)
+                enlace = servidor + rtt + transferidos * 8 / kbps  # kbps = bits por milisegundo
+                print(f"      🔹 {codificacion:<8} {respuesta.status_code} · {transferidos:>7} bytes de cuerpo · "
+                      f"servidor p50 {servidor:.2f} ms · total en el enlace {enlace:.0f} ms")
+    print("✅ Medición terminada.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mide bytes y latencia con y sin compresión/ETag.")
+    parser.add_argument('--kbps', type=float, default=1600, help="Ancho de banda de bajada simulado")
+    parser.add_argument('--rtt', type=float, default=150, help="Ida y vuelta simulada en ms")
+    parser.add_argument('--repeticiones', type=int, default=50)
+    args = parser.parse_args()
+    run_medicion(args.kbps, args.rtt, args.repeticiones)
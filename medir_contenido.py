@@ -0,0 +1,57 @@
+# medir_contenido.py
+"""Benchmark del render de ticket_detalle en tickets con muchos comentarios.
+
+Uso: python medir_contenido.py [--comentarios 500] [--repeticiones 200]
+Compara el render actual (lee contenido_html ya sanitizado) con lo que costaría sanitizar en
+cada render la misma página de comentarios.
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from medicion import app_temporal, crear_base, iniciar_sesion, cronometrar, resumen
+
+COMENTARIO_HTML = (
+    '<p>Revisé el equipo y <b>el problema</b> persiste. Pasos:</p>'
+    '<ol><li>Reinicié el <span style="color: rgb(200, 0, 0)">servicio</span></li><li>Limpié la caché</li>'
+    '<li>Probé con <a href="https://soporte.ticketera.cl/kb/42" target="_blank">el artículo 42</a></li></ol>'
+    '<table><tr><td>Antes</td><td>Después</td></tr><tr><td>12 s</td><td>3 s</td></tr></table>'
+    '<script>alert("x")</script><p onclick="x()">Quedo atento.</p>'
+)
+
+
+def run_medicion(comentarios=500, repeticiones=200):
+    from modelos import db, Ticket, Comentario
+    from contenido import procesar_html
+    from rutas.ticket import COMENTARIOS_POR_PAGINA
+    with app_temporal() as app:
+        categoria, (tecnico, _), (usuario,) = crear_base()
+        ticket = Ticket(asunto='Ticket con hilo largo', descripcion=COMENTARIO_HTML, usuario_id=usuario.id,
+                        tecnico_id=tecnico.id, categoria_id=categoria.id, estado='En Proceso',
+                        fecha_vencimiento_sla=datetime.utcnow() + timedelta(days=1))
+        db.session.add(ticket)
+        db.session.flush()
+        print(f"💬 Creando {comentarios} comentarios (sanitizados al escribir)...")
+        db.session.add_all(Comentario(contenido=COMENTARIO_HTML, ticket_id=ticket.id,
+                                      usuario_id=(tecnico if n % 2 else usuario).id) for n in range(comentarios))
+        db.session.commit()
+
+        cliente = app.test_client()
+        iniciar_sesion(cliente, tecnico)
+        cliente.get(f'/ticket/{ticket.id}')  # Calentamiento (plantillas, conexiones)
+        print(f"⏱️ {repeticiones} renders de /ticket/{ticket.id}:")
+        resumen("Render leyendo *_html", cronometrar(lambda: cliente.get(f'/ticket/{ticket.id}'), repeticiones))
+        pagina = [COMENTARIO_HTML] * (COMENTARIOS_POR_PAGINA + 1)  # Comentarios de la página + descripción
+        resumen(f"Sanitizar {len(pagina)} bloques por render (lo que se evita)",
+                cronometrar(lambda: [procesar_html(h) for h in pagina], repeticiones))
+        antes = min(c.id for c in Comentario.query.filter_by(ticket_id=ticket.id)) + COMENTARIOS_POR_PAGINA * 2
+        resumen("JSON 'Cargar anteriores'",
+                cronometrar(lambda: cliente.get(f'/ticket/{ticket.id}/comentarios?antes={antes}'), repeticiones))
+    print("✅ Medición terminada.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mide el render de tickets con muchos comentarios.")
+    parser.add_argument('--comentarios', type=int, default=500)
+    parser.add_argument('--repeticiones', type=int, default=200)
+    args = parser.parse_args()
+    run_medicion(args.comentarios, args.repeticiones)
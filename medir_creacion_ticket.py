@@ -0,0 +1,82 @@
+# medir_creacion_ticket.py
+"""Benchmark de la latencia de crear un ticket según el estado de la caché de feriados.
+
+Uso: python medir_creacion_ticket.py [--repeticiones 20] [--demora 1.0]
+Levanta una API de feriados local que tarda `--demora` segundos en responder (o que falla, para
+simular la API caída) y mide POST /usuario/crear en tres escenarios:
+  1. Caché fría en cada request (lo que pagaba el primer ticket de cada worker).
+  2. API caída: solo el primer request paga el timeout, el resto usa la caché negativa.
+  3. Feriados precargados con precargar_feriados(), como hace run.py al arrancar.
+"""
+
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from medicion import app_temporal, crear_base, iniciar_sesion, cronometrar, resumen
+
+FERIADOS = [{'fecha': f'{anio}-{mes}'} for anio in range(2020, 2040) for mes in ('01-01', '05-01', '09-18', '09-19', '12-25')]
+
+
+def _api_local(demora, caida):
+    """Servidor HTTP en un hilo que imita la API de feriados. Devuelve (servidor, url)."""
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(demora)
+            cuerpo = json.dumps(FERIADOS).encode()
+            self.send_response(503 if caida else 200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), Manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}/fl/feriados/{{anio}}"
+
+
+def run_medicion(repeticiones=20, demora=1.0):
+    import utilidades
+    with app_temporal() as app:
+        categoria, _, (usuario,) = crear_base()
+        cliente = app.test_client()
+        iniciar_sesion(cliente, usuario)
+        datos = {'asunto': 'No funciona la impresora', 'descripcion': 'Medición', 'prioridad': 'Media',
+                 'categoria_id': str(categoria.id)}
+
+        def crear():
+            respuesta = cliente.post('/usuario/crear', data=datos)
+            assert respuesta.status_code == 302, f"Crear ticket falló ({respuesta.status_code})"
+
+        print(f"⏱️ {repeticiones} tickets por escenario (SLA {categoria.sla_resolucion} h, API con {demora:.1f} s de demora):")
+        servidor, utilidades.FERIADOS_API_URL = _api_local(demora, caida=False)
+
+        def crear_sin_cache():
+            utilidades.FERIADOS_CACHE.clear()
+            crear()
+        resumen("Caché fría (consulta la API en el request)", cronometrar(crear_sin_cache, repeticiones))
+        servidor.shutdown()
+
+        servidor, utilidades.FERIADOS_API_URL = _api_local(demora, caida=True)
+        utilidades.FERIADOS_CACHE.clear()
+        resumen("API caída con caché negativa", cronometrar(crear, repeticiones))
+        servidor.shutdown()
+
+        servidor, utilidades.FERIADOS_API_URL = _api_local(demora, caida=False)
+        utilidades.FERIADOS_CACHE.clear()
+        utilidades.precargar_feriados().join()
+        resumen("Feriados precargados al arrancar", cronometrar(crear, repeticiones))
+        servidor.shutdown()
+    print("✅ Medición terminada.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mide la creación de tickets con y sin feriados en caché.")
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--demora', type=float, default=1.0, help="Segundos que tarda la API simulada")
+    args = parser.parse_args()
+    run_medicion(args.repeticiones, args.demora)
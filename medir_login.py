@@ -0,0 +1,101 @@
+# medir_login.py
+"""Benchmark de logins concurrentes: hashing en los hilos del servidor vs. en el pool de procesos.
+
+Uso: python medir_login.py [--clientes 16] [--logins 200] [--hilos 8]
+Levanta la app con waitress en un puerto local y `--clientes` hilos hacen POST / en paralelo
+(cada login con un usuario distinto, hashes con PASSWORD_HASH_METHOD). Mide logins por segundo
+y latencia con HASH_WORKERS=0 (scrypt dentro del hilo, compite por el GIL) y con el pool.
+"""
+
+import os
+
+# Sin límite de intentos: aquí se mide el hashing, no el limitador
+os.environ.setdefault("LOGIN_MAX_INTENTOS_RUT", "1000000")
+os.environ.setdefault("LOGIN_MAX_INTENTOS_IP", "1000000")
+
+import time
+import argparse
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from medicion import app_temporal, crear_base, resumen, PASSWORD
+
+
+class _SinRedireccion(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None  # El 302 del login exitoso es la respuesta que se mide
+
+
+def _login(url, rut):
+    datos = urllib.parse.urlencode({'rut': rut, 'password': PASSWORD}).encode()
+    inicio = time.perf_counter()
+    try:
+        urllib.request.build_opener(_SinRedireccion).open(url, datos, timeout=60)
+        codigo = 200
+    except urllib.error.HTTPError as e:
+        codigo = e.code
+    return (time.perf_counter() - inicio) * 1000, codigo
+
+
+def _sondear(url, detener, tiempos):
+    """GET de la página de login mientras dura la ronda: latencia de un request barato bajo carga."""
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        urllib.request.urlopen(url, timeout=60).read()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        time.sleep(0.05)
+
+
+def _ronda(titulo, url, ruts, clientes):
+    detener, sondeo = threading.Event(), []
+    sonda = threading.Thread(target=_sondear, args=(url, detener, sondeo))
+    sonda.start()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as ejecutor:
+        resultados = list(ejecutor.map(lambda rut: _login(url, rut), ruts))
+    segundos = time.perf_counter() - inicio
+    detener.set()
+    sonda.join()
+    exitosos = sum(1 for _, codigo in resultados if codigo == 302)
+    # Los que no redirigen son rechazos por ServidorOcupado (cola del pool llena)
+    print(f"   🔸 {titulo}: {exitosos / segundos:.1f} logins/s, {exitosos}/{len(ruts)} exitosos, "
+          f"{len(ruts) - exitosos} rechazados por cola llena")
+    resumen("Latencia de login", [ms for ms, _ in resultados])
+    resumen("GET / durante la carga", sondeo)
+
+
+def run_medicion(clientes=16, logins=200, hilos=8):
+    import seguridad
+    from waitress.server import create_server
+    with app_temporal() as app:
+        _, _, usuarios = crear_base(cantidad_usuarios=logins, metodo_hash=seguridad.HASH_METHOD)
+        ruts = [u.rut for u in usuarios]
+        servidor = create_server(app, host='127.0.0.1', port=0, threads=hilos)
+        threading.Thread(target=servidor.run, daemon=True).start()
+        url = f"http://127.0.0.1:{servidor.effective_port}/"
+        print(f"⏱️ {logins} logins con {clientes} clientes concurrentes, waitress con {hilos} hilos "
+              f"({seguridad.HASH_METHOD}):")
+
+        trabajadores = seguridad.HASH_WORKERS
+        seguridad.HASH_WORKERS = 0
+        _ronda("Hash en el hilo del request", url, ruts, clientes)
+
+        seguridad.HASH_WORKERS = max(trabajadores, 1)
+        inicio = time.perf_counter()
+        seguridad.precalentar_pool()
+        print(f"   🔸 Pool de {seguridad.HASH_WORKERS} procesos ({seguridad.HASH_MP_CONTEXTO}) "
+              f"precalentado en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        _ronda("Hash en el pool de procesos", url, ruts, clientes)
+        servidor.close()
+    print("✅ Medición terminada.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mide el throughput de login bajo carga concurrente.")
+    parser.add_argument('--clientes', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--hilos', type=int, default=8, help="Hilos de waitress")
+    args = parser.parse_args()
+    run_medicion(args.clientes, args.logins, args.hilos)
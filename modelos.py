@@ -0,0 +1,259 @@
+# modelos.py
+"""Modelos de la base de datos. `db` se enlaza a la aplicación en create_app() (ver app.py)."""
+
+import sqlite3
+from datetime import datetime
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.functions import FunctionElement
+from contenido import procesar_html
+
+db = SQLAlchemy()
+
+def _minusculas(valor):
+    return valor.lower() if isinstance(valor, str) else valor
+
+@event.listens_for(Engine, "connect")
+def _activar_fk_sqlite(dbapi_connection, connection_record):
+    """SQLite ignora ON DELETE salvo que se activen las FK en cada conexión. También registra minusculas()."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function('minusculas', 1, _minusculas, deterministic=True)
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+class minusculas(FunctionElement):
+    """lower() que también convierte tildes y ñ. En Postgres es el lower() nativo; en SQLite, cuyo
+    lower() solo convierte ASCII, es la función Python registrada arriba (el lower() nativo no se toca)."""
+    type = db.String()
+    name = 'minusculas'
+    inherit_cache = True
+
+@compiles(minusculas)
+def _minusculas_sql(elemento, compilador, **kw):
+    return f"lower({compilador.process(elemento.clauses, **kw)})"
+
+@compiles(minusculas, 'sqlite')
+def _minusculas_sqlite(elemento, compilador, **kw):
+    return f"minusculas({compilador.process(elemento.clauses, **kw)})"
+
+def rut_normalizado(rut):
+    """Expresión SQL del RUT sin puntos ni guion y con K mayúscula ('12.345.678-k' -> '12345678K').
+    Las constantes van como literales para que la consulta coincida con la expresión del índice."""
+    sin_puntos = db.func.replace(rut, db.literal_column("'.'"), db.literal_column("''"))
+    return db.func.upper(db.func.replace(sin_puntos, db.literal_column("'-'"), db.literal_column("''")))
+
+# --- MODELOS DE LA BASE DE DATOS ---
+class Usuario(db.Model):
+    __tablename__ = 'usuarios'
+    id = db.Column(db.Integer, primary_key=True)
+    rut = db.Column(db.String(12), unique=True, nullable=False)
+    nombre = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(100), unique=True, nullable=False)
+    password = db.Column(db.String(200), nullable=False)
+    rol = db.Column(db.String(20), nullable=False, default='Usuario')
+    eliminado = db.Column(db.Boolean, nullable=False, default=False) # Borrado lógico; los datos se purgan en segundo plano (purga.py)
+    fecha_eliminacion = db.Column(db.DateTime, nullable=True)
+    
+    # passive_deletes: los hijos los borra/anula la BD (ON DELETE), SQLAlchemy no los carga en memoria
+    tickets_creados = db.relationship('Ticket', backref='creador', lazy=True, foreign_keys='Ticket.usuario_id', cascade="all, delete-orphan", passive_deletes=True)
+    tickets_asignados = db.relationship('Ticket', backref='tecnico_asignado', lazy=True, foreign_keys='Ticket.tecnico_id', passive_deletes=True)
+    activos_asignados = db.relationship('Activo', backref='asignado_a', lazy=True, passive_deletes=True)
+    notificaciones = db.relationship('Notificacion', backref='usuario', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    comentarios = db.relationship('Comentario', backref='autor', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    logs = db.relationship('LogAuditoria', backref='usuario', lazy=True, passive_deletes=True)
+    # Espejo de las relaciones anteriores sobre las tablas de archivo
+    tickets_creados_archivo = db.relationship('TicketArchivo', backref='creador', lazy=True, foreign_keys='TicketArchivo.usuario_id', cascade="all, delete-orphan", passive_deletes=True)
+    tickets_asignados_archivo = db.relationship('TicketArchivo', backref='tecnico_asignado', lazy=True, foreign_keys='TicketArchivo.tecnico_id', passive_deletes=True)
+    notificaciones_archivo = db.relationship('NotificacionArchivo', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    comentarios_archivo = db.relationship('ComentarioArchivo', backref='autor', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    __table_args__ = (
+        # Índices de prefijo para la búsqueda typeahead (directorio.py): LIKE 'abc%' sobre minusculas(...)
+        # text_pattern_ops permite usarlos en Postgres aunque la collation no sea "C"
+        db.Index('ix_usuarios_nombre_minusculas', minusculas(nombre).label('nombre_prefijo'),
+                 postgresql_ops={'nombre_prefijo': 'text_pattern_ops'}),
+        db.Index('ix_usuarios_email_minusculas', minusculas(email).label('email_prefijo'),
+                 postgresql_ops={'email_prefijo': 'text_pattern_ops'}),
+        db.Index('ix_usuarios_rut_normalizado', rut_normalizado(rut).label('rut_normalizado'),
+                 postgresql_ops={'rut_normalizado': 'text_pattern_ops'}),
+    )
+
+class Categoria(db.Model):
+    __tablename__ = 'categorias'
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(100), unique=True, nullable=False)
+    descripcion = db.Column(db.String(255))
+    sla_respuesta = db.Column(db.Integer, nullable=False)
+    sla_resolucion = db.Column(db.Integer, nullable=False)
+
+class Ticket(db.Model):
+    __tablename__ = 'tickets'
+    id = db.Column(db.Integer, primary_key=True)
+    asunto = db.Column(db.String(200), nullable=False)
+    descripcion = db.Column(db.Text, nullable=False)
+    descripcion_html = db.Column(db.Text, nullable=True) # HTML ya sanitizado (contenido.py), se genera al escribir
+    descripcion_texto = db.Column(db.Text, nullable=True) # Texto plano para búsquedas y exportes
+    estado = db.Column(db.String(50), nullable=False, default='Abierto')
+    prioridad = db.Column(db.String(50), nullable=False, default='Media')
+    fecha_creacion = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    fecha_vencimiento_sla = db.Column(db.DateTime, nullable=True)
+    fecha_cierre = db.Column(db.DateTime, nullable=True)
+    es_sla_extendido = db.Column(db.Boolean, default=False) # NUEVO: Para marcar si se usó la API
+    sla_aviso = db.Column(db.SmallInteger, nullable=False, default=0) # Último aviso del monitor SLA (0 ninguno, 1 próximo, 2 vencido)
+    fecha_actualizacion = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow, index=True) # Versión barata para ETags
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='CASCADE'), nullable=False, index=True)
+    tecnico_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='SET NULL'), nullable=True)
+    categoria_id = db.Column(db.Integer, db.ForeignKey('categorias.id', ondelete='RESTRICT'), nullable=False)
+    categoria = db.relationship('Categoria', backref=db.backref('tickets', passive_deletes='all'))
+    comentarios = db.relationship('Comentario', backref='ticket', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    adjuntos = db.relationship('Adjunto', backref='ticket', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    __table_args__ = (
+        # Índice parcial: solo tickets no cerrados, que son los que revisa el monitor SLA
+        db.Index('ix_tickets_sla_pendientes', 'sla_aviso', 'fecha_vencimiento_sla',
+                 postgresql_where=db.text("estado <> 'Cerrado'"), sqlite_where=db.text("estado <> 'Cerrado'")),
+        # Sin AUTOINCREMENT, SQLite reutiliza el id más alto cuando su fila se archiva y choca con tickets_archivo
+        {'sqlite_autoincrement': True},
+    )
+
+class Activo(db.Model):
+    __tablename__ = 'activos'
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(100), nullable=False)
+    marca = db.Column(db.String(100))
+    modelo = db.Column(db.String(100))
+    numero_serie = db.Column(db.String(100), unique=True)
+    asignado_a_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='SET NULL'), nullable=True)
+
+class Articulo(db.Model):
+    __tablename__ = 'articulos'
+    id = db.Column(db.Integer, primary_key=True)
+    titulo = db.Column(db.String(200), nullable=False)
+    contenido = db.Column(db.Text, nullable=False)
+    categoria_faq = db.Column(db.String(100), nullable=False)
+    fecha_creacion = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+
+class Notificacion(db.Model):
+    __tablename__ = 'notificaciones'
+    id = db.Column(db.Integer, primary_key=True)
+    mensaje = db.Column(db.String(255), nullable=False)
+    leida = db.Column(db.Boolean, default=False, nullable=False)
+    fecha_creacion = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='CASCADE'), nullable=False, index=True)
+    ticket_id = db.Column(db.Integer, db.ForeignKey('tickets.id', ondelete='CASCADE'), nullable=True, index=True)
+    __table_args__ = {'sqlite_autoincrement': True}  # Ids no reutilizables, ver Ticket
+
+class Comentario(db.Model):
+    __tablename__ = 'comentarios'
+    id = db.Column(db.Integer, primary_key=True)
+    contenido = db.Column(db.Text, nullable=False)
+    contenido_html = db.Column(db.Text, nullable=True)
+    contenido_texto = db.Column(db.Text, nullable=True)
+    fecha_creacion = db.Column(db.DateTime, default=db.func.current_timestamp())
+    ticket_id = db.Column(db.Integer, db.ForeignKey('tickets.id', ondelete='CASCADE'), nullable=False)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='CASCADE'), nullable=False, index=True)
+    __table_args__ = (db.Index('ix_comentarios_ticket_id_id', 'ticket_id', 'id'), # Paginación keyset del hilo
+                      {'sqlite_autoincrement': True})
+
+class Adjunto(db.Model):
+    __tablename__ = 'adjuntos'
+    id = db.Column(db.Integer, primary_key=True)
+    nombre_archivo = db.Column(db.String(255), nullable=False)
+    ticket_id = db.Column(db.Integer, db.ForeignKey('tickets.id', ondelete='CASCADE'), nullable=False, index=True)
+    __table_args__ = {'sqlite_autoincrement': True}
+
+class LogAuditoria(db.Model):
+    __tablename__ = 'logs_auditoria'
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='SET NULL'), nullable=True)
+    usuario_nombre_backup = db.Column(db.String(100))
+    accion = db.Column(db.String(50), nullable=False)
+    detalles = db.Column(db.Text)
+    fecha = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+# --- TABLAS DE ARCHIVO (tickets cerrados hace tiempo, ver archivar.py) ---
+# Mismas columnas que las tablas calientes, en el mismo orden, para poder copiar con INSERT ... SELECT
+class TicketArchivo(db.Model):
+    __tablename__ = 'tickets_archivo'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    asunto = db.Column(db.String(200), nullable=False)
+    descripcion = db.Column(db.Text, nullable=False)
+    descripcion_html = db.Column(db.Text, nullable=True)
+    descripcion_texto = db.Column(db.Text, nullable=True)
+    estado = db.Column(db.String(50), nullable=False)
+    prioridad = db.Column(db.String(50), nullable=False)
+    fecha_creacion = db.Column(db.DateTime, nullable=False)
+    fecha_vencimiento_sla = db.Column(db.DateTime, nullable=True)
+    fecha_cierre = db.Column(db.DateTime, nullable=True)
+    es_sla_extendido = db.Column(db.Boolean, default=False)
+    sla_aviso = db.Column(db.SmallInteger, nullable=False, default=0)
+    fecha_actualizacion = db.Column(db.DateTime, nullable=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='CASCADE'), nullable=False, index=True)
+    tecnico_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='SET NULL'), nullable=True)
+    categoria_id = db.Column(db.Integer, db.ForeignKey('categorias.id', ondelete='RESTRICT'), nullable=False)
+    fecha_archivado = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp())
+    categoria = db.relationship('Categoria')
+    comentarios = db.relationship('ComentarioArchivo', backref='ticket', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    adjuntos = db.relationship('AdjuntoArchivo', backref='ticket', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+
+class ComentarioArchivo(db.Model):
+    __tablename__ = 'comentarios_archivo'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    contenido = db.Column(db.Text, nullable=False)
+    contenido_html = db.Column(db.Text, nullable=True)
+    contenido_texto = db.Column(db.Text, nullable=True)
+    fecha_creacion = db.Column(db.DateTime)
+    ticket_id = db.Column(db.Integer, db.ForeignKey('tickets_archivo.id', ondelete='CASCADE'), nullable=False)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='CASCADE'), nullable=False, index=True)
+    __table_args__ = (db.Index('ix_comentarios_archivo_ticket_id_id', 'ticket_id', 'id'),)
+
+class NotificacionArchivo(db.Model):
+    __tablename__ = 'notificaciones_archivo'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    mensaje = db.Column(db.String(255), nullable=False)
+    leida = db.Column(db.Boolean, default=False, nullable=False)
+    fecha_creacion = db.Column(db.DateTime, nullable=False)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='CASCADE'), nullable=False, index=True)
+    ticket_id = db.Column(db.Integer, db.ForeignKey('tickets_archivo.id', ondelete='CASCADE'), nullable=True, index=True)
+
+class AdjuntoArchivo(db.Model):
+    __tablename__ = 'adjuntos_archivo'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    nombre_archivo = db.Column(db.String(255), nullable=False)
+    ticket_id = db.Column(db.Integer, db.ForeignKey('tickets_archivo.id', ondelete='CASCADE'), nullable=False, index=True)
+
+# --- SANITIZACIÓN AL ESCRIBIR: se limpia una vez y las vistas solo leen la columna *_html ---
+@event.listens_for(Ticket.descripcion, 'set')
+def _procesar_descripcion(ticket, valor, anterior, iniciador):
+    ticket.descripcion_html, ticket.descripcion_texto = procesar_html(valor)
+
+@event.listens_for(Ticket.estado, 'set')
+def _reiniciar_aviso_reapertura(ticket, valor, anterior, iniciador):
+    if anterior == 'Cerrado' and valor != 'Cerrado':
+        ticket.sla_aviso = 0  # Reabierto: el monitor SLA vuelve a avisar
+
+@event.listens_for(Ticket.fecha_vencimiento_sla, 'set')
+def _reiniciar_aviso_vencimiento(ticket, valor, anterior, iniciador):
+    if isinstance(anterior, datetime) and valor != anterior:
+        ticket.sla_aviso = 0  # Los avisos eran para el vencimiento anterior
+
+@event.listens_for(Comentario.contenido, 'set')
+def _procesar_comentario(comentario, valor, anterior, iniciador):
+    comentario.contenido_html, comentario.contenido_texto = procesar_html(valor)
+
+def tickets_con_archivo():
+    """Entidad Ticket de solo lectura sobre tickets + tickets_archivo (para búsquedas y exportes)."""
+    columnas = [c.name for c in Ticket.__table__.columns]
+    union = db.union_all(
+        db.select(*[Ticket.__table__.c[n] for n in columnas]),
+        db.select(*[TicketArchivo.__table__.c[n] for n in columnas]),
+    ).subquery('tickets_todos')
+    return aliased(Ticket, union, name='ticket')
+
+class LeaseTarea(db.Model):
+    __tablename__ = 'leases_tareas'
+    nombre = db.Column(db.String(50), primary_key=True)
+    propietario = db.Column(db.String(150), nullable=False)
+    expira = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,150 @@
+# monitor_sla.py
+"""Monitor de SLA en segundo plano: avisa y escala tickets próximos a vencer o vencidos."""
+
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from modelos import db, Ticket, Usuario, Notificacion, LeaseTarea
+
+# --- CONFIGURACIÓN ---
+INTERVALO_SEG = int(os.getenv("SLA_MONITOR_INTERVALO", 300))
+ANTICIPACION = timedelta(hours=float(os.getenv("SLA_MONITOR_ANTICIPACION_HORAS", 2)))
+LOTE = int(os.getenv("SLA_MONITOR_LOTE", 500))
+NOMBRE_LEASE = 'monitor_sla'
+PROPIETARIO = f"{socket.gethostname()}:{os.getpid()}"
+
+# Valores de Ticket.sla_aviso
+AVISO_NINGUNO, AVISO_PROXIMO, AVISO_VENCIDO = 0, 1, 2
+ESCALA_PRIORIDAD = {'Baja': 'Media', 'Media': 'Alta', 'Alta': 'Crítica'}
+
+
+def tomar_lease(nombre=NOMBRE_LEASE, propietario=PROPIETARIO, duracion=timedelta(seconds=INTERVALO_SEG * 3)):
+    """Toma o renueva el lease en BD. Solo un nodo a la vez puede tenerlo vigente."""
+    ahora = datetime.utcnow()
+    filas = (LeaseTarea.query
+             .filter(LeaseTarea.nombre == nombre, or_(LeaseTarea.expira < ahora, LeaseTarea.propietario == propietario))
+             .update({'propietario': propietario, 'expira': ahora + duracion}, synchronize_session=False))
+    if filas:
+        db.session.commit()
+        return True
+    if db.session.get(LeaseTarea, nombre) is not None:
+        db.session.rollback()
+        return False  # Otro nodo lo tiene vigente
+    try:
+        db.session.add(LeaseTarea(nombre=nombre, propietario=propietario, expira=ahora + duracion))
+        db.session.commit()
+        return True
+    except IntegrityError:
+        db.session.rollback()  # Otro nodo lo creó primero
+        return False
+
+
+def liberar_lease(nombre=NOMBRE_LEASE, propietario=PROPIETARIO):
+    """Expira el lease si es nuestro, para que otro proceso pueda tomarlo sin esperar la duración completa."""
+    LeaseTarea.query.filter_by(nombre=nombre, propietario=propietario).update(
+        {'expira': datetime.utcnow() - timedelta(seconds=1)}, synchronize_session=False)
+    db.session.commit()
+
+
+def _pendientes(nivel, desde, hasta):
+    """Lote de tickets abiertos con vencimiento en [desde, hasta] aún no avisados en este nivel."""
+    query = db.session.query(Ticket.id, Ticket.tecnico_id, Ticket.prioridad, Ticket.fecha_vencimiento_sla).filter(
+        Ticket.estado != 'Cerrado',
+        Ticket.sla_aviso < nivel,
+        Ticket.fecha_vencimiento_sla <= hasta)
+    if desde is not None:
+        query = query.filter(Ticket.fecha_vencimiento_sla > desde)
+    return query.order_by(Ticket.fecha_vencimiento_sla).limit(LOTE).all()
+
+
+def _procesar_lote(lote, nivel, supervisores, ahora):
+    notificaciones = []
+    ids_por_prioridad = {}
+    for ticket_id, tecnico_id, prioridad, vencimiento in lote:
+        if nivel == AVISO_VENCIDO:
+            mensaje = f"El ticket #{ticket_id} superó su SLA de resolución. Prioridad escalada."
+            destinatarios = set(supervisores)
+            if tecnico_id:
+                destinatarios.add(tecnico_id)
+            prioridad = ESCALA_PRIORIDAD.get(prioridad, prioridad)
+        else:
+            mensaje = f"El ticket #{ticket_id} vence su SLA el {vencimiento.strftime('%d-%m-%Y %H:%M')}."
+            destinatarios = {tecnico_id} if tecnico_id else set(supervisores)
+        notificaciones.extend({'mensaje': mensaje, 'usuario_id': d, 'ticket_id': ticket_id,
+                               'leida': False, 'fecha_creacion': ahora} for d in destinatarios)
+        ids_por_prioridad.setdefault(prioridad, []).append(ticket_id)
+
+    if notificaciones:
+        db.session.bulk_insert_mappings(Notificacion, notificaciones)
+    for prioridad, ids in ids_por_prioridad.items():
+        # La condición sobre sla_aviso hace el update idempotente si dos pasadas se cruzan
+        Ticket.query.filter(Ticket.id.in_(ids), Ticket.sla_aviso < nivel).update(
+            {'sla_aviso': nivel, 'prioridad': prioridad}, synchronize_session=False)
+    db.session.commit()
+
+
+def revisar_sla(ahora=None):
+    """Una pasada incremental del monitor. Devuelve cuántos tickets se avisaron por nivel."""
+    ahora = ahora or datetime.utcnow()
+    supervisores = [u.id for u in db.session.query(Usuario.id).filter_by(rol='Técnico Nivel 2', eliminado=False)]
+    resumen = {'vencidos': 0, 'proximos': 0}
+    for nivel, clave, desde, hasta in ((AVISO_VENCIDO, 'vencidos', None, ahora),
+                                       (AVISO_PROXIMO, 'proximos', ahora, ahora + ANTICIPACION)):
+        while True:
+            lote = _pendientes(nivel, desde, hasta)
+            if not lote:
+                break
+            _procesar_lote(lote, nivel, supervisores, ahora)
+            resumen[clave] += len(lote)
+    return resumen
+
+
+# --- HILO EN SEGUNDO PLANO ---
+_detener = threading.Event()
+_hilo = None
+
+
+def _bucle(app):
+    while not _detener.is_set():
+        with app.app_context():
+            try:
+                if tomar_lease():
+                    resumen = revisar_sla()
+                    if resumen['vencidos'] or resumen['proximos']:
+                        print(f"⏰ Monitor SLA: {resumen['vencidos']} vencidos, {resumen['proximos']} próximos a vencer.")
+            except Exception:
+                # Cualquier error se registra y se reintenta en la próxima pasada: si el hilo muriera
+                # seguiría renovado el lease hasta expirar y ningún otro nodo tomaría el monitor
+                db.session.rollback()
+                app.logger.exception("Error en el monitor SLA")
+            finally:
+                db.session.remove()
+        _detener.wait(INTERVALO_SEG)
+    with app.app_context():
+        try:
+            liberar_lease()
+        except Exception:
+            app.logger.exception("No se pudo liberar el lease del monitor SLA")
+        finally:
+            db.session.remove()
+
+
+def iniciar_monitor_sla(app):
+    """Arranca el hilo del monitor (desactivable con SLA_MONITOR_ACTIVO=0)."""
+    global _hilo
+    if os.getenv("SLA_MONITOR_ACTIVO", "1") != "1":
+        return None
+    _detener.clear()
+    _hilo = threading.Thread(target=_bucle, args=(app,), name='monitor-sla', daemon=True)
+    _hilo.start()
+    return _hilo
+
+
+def detener_monitor_sla(timeout=30):
+    """Detiene el hilo y espera a que libere el lease, para que otro nodo tome el monitor sin esperar a que expire."""
+    _detener.set()
+    if _hilo is not None:
+        _hilo.join(timeout)
@@ -0,0 +1,66 @@
+# purga.py
+"""Purga por lotes de los datos de usuarios con borrado lógico (Usuario.eliminado).
+
+eliminar_usuario solo marca al usuario y encola purgar_usuario como efecto post-commit.
+Si el proceso se cae a mitad de camino, `python purga.py` termina las purgas pendientes.
+"""
+
+import os
+from sqlalchemy import select, delete
+from app import create_app
+from modelos import (db, Usuario, Ticket, Comentario, Notificacion,
+                     TicketArchivo, ComentarioArchivo, NotificacionArchivo)
+
+LOTE = int(os.getenv("PURGA_LOTE", 500))
+
+# (modelo, columna que apunta al usuario). Los tickets van al final: al borrarlos, la BD
+# elimina en cascada sus comentarios, notificaciones y adjuntos (ON DELETE CASCADE).
+TABLAS = [
+    (Comentario, 'usuario_id'),
+    (Notificacion, 'usuario_id'),
+    (Ticket, 'usuario_id'),
+    (ComentarioArchivo, 'usuario_id'),
+    (NotificacionArchivo, 'usuario_id'),
+    (TicketArchivo, 'usuario_id'),
+]
+
+
+def _borrar_por_lotes(modelo, columna, usuario_id, lote):
+    tabla = modelo.__table__
+    total = 0
+    while True:
+        ids = select(tabla.c.id).where(tabla.c[columna] == usuario_id).limit(lote).scalar_subquery()
+        borrados = db.session.execute(delete(tabla).where(tabla.c.id.in_(ids))).rowcount
+        db.session.commit()
+        total += borrados
+        if borrados < lote:
+            return total
+
+
+def purgar_usuario(usuario_id, lote=LOTE):
+    """Borra en lotes (un commit por lote) los datos del usuario y finalmente la fila del usuario.
+
+    Es reanudable: si se interrumpe, volver a llamarla continúa donde quedó.
+    """
+    usuario = db.session.get(Usuario, usuario_id)
+    if usuario is None or not usuario.eliminado:
+        return
+    for modelo, columna in TABLAS:
+        _borrar_por_lotes(modelo, columna, usuario_id, lote)
+    # Lo que queda (tickets asignados, activos, logs) lo deja en NULL la BD con ON DELETE SET NULL
+    db.session.execute(delete(Usuario.__table__).where(Usuario.__table__.c.id == usuario_id))
+    db.session.commit()
+
+
+def run_purga():
+    with create_app().app_context():
+        pendientes = [u.id for u in db.session.query(Usuario.id).filter_by(eliminado=True)]
+        print(f"🧹 {len(pendientes)} usuarios pendientes de purga...")
+        for usuario_id in pendientes:
+            purgar_usuario(usuario_id)
+            print(f"   🔹 Usuario #{usuario_id} purgado")
+        print("✅ Purga completada.")
+
+
+if __name__ == '__main__':
+    run_purga()
@@ -0,0 +1,58 @@
+# rellenar_contenido.py
+"""Genera descripcion_html/_texto y contenido_html/_texto para filas anteriores a la sanitización.
+
+Uso: python rellenar_contenido.py [--lote 500]
+Avanza por id en lotes con un commit por lote; si se interrumpe, al relanzar sigue con lo que falta.
+"""
+
+import argparse
+from sqlalchemy import select, update
+from app import create_app
+from modelos import db, Ticket, Comentario, TicketArchivo, ComentarioArchivo
+from contenido import procesar_html
+
+# (modelo, columna original, columna html, columna texto)
+COLUMNAS = [
+    (Ticket, 'descripcion', 'descripcion_html', 'descripcion_texto'),
+    (Comentario, 'contenido', 'contenido_html', 'contenido_texto'),
+    (TicketArchivo, 'descripcion', 'descripcion_html', 'descripcion_texto'),
+    (ComentarioArchivo, 'contenido', 'contenido_html', 'contenido_texto'),
+]
+
+
+def rellenar(modelo, original, col_html, col_texto, lote):
+    tabla = modelo.__table__
+    ultimo_id, total = 0, 0
+    while True:
+        filas = db.session.execute(
+            select(tabla.c.id, tabla.c[original])
+            .where(tabla.c.id > ultimo_id, tabla.c[col_html].is_(None))
+            .order_by(tabla.c.id).limit(lote)
+        ).all()
+        if not filas:
+            return total
+        cambios = []
+        for fila_id, valor in filas:
+            html, texto = procesar_html(valor)
+            cambios.append({'b_id': fila_id, 'html': html, 'texto': texto})
+        db.session.execute(
+            update(tabla).where(tabla.c.id == db.bindparam('b_id')).values({col_html: db.bindparam('html'), col_texto: db.bindparam('texto')}),
+            cambios)
+        db.session.commit()
+        ultimo_id = filas[-1][0]
+        total += len(filas)
+
+
+def run_relleno(lote=500):
+    with create_app().app_context():
+        for modelo, original, col_html, col_texto in COLUMNAS:
+            total = rellenar(modelo, original, col_html, col_texto, lote)
+            print(f"🔹 {modelo.__tablename__}: {total} filas procesadas")
+        print("✅ Contenido sanitizado.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sanitiza el contenido enriquecido existente.")
+    parser.add_argument('--lote', type=int, default=500, help="Filas por transacción")
+    args = parser.parse_args()
+    run_relleno(args.lote)
@@ -2,11 +2,26 @@
 
 from dotenv import load_dotenv
 from waitress import serve
-from app import app
+from app import create_app
+from monitor_sla import iniciar_monitor_sla, detener_monitor_sla
+from efectos import drenar_efectos
+from utilidades import precargar_feriados
+from seguridad import precalentar_pool
 
 # Cargar las variables de entorno desde el archivo .env ANTES de hacer cualquier otra cosa
 load_dotenv()
 
 if __name__ == '__main__':
-    # Iniciar el servidor de producción Waitress
-    serve(app, host='127.0.0.1', port=5000)
\ No newline at end of file
+    app = create_app()
+    # Monitor de SLA en segundo plano (solo un nodo lo ejecuta gracias al lease en BD)
+    iniciar_monitor_sla(app)
+    # Feriados del año en memoria antes de que el primer ticket calcule su SLA
+    precargar_feriados()
+    # Procesos de hashing listos antes del primer login
+    precalentar_pool()
+    try:
+        # Iniciar el servidor de producción Waitress
+        serve(app, host='127.0.0.1', port=5000)
+    finally:
+        detener_monitor_sla()
+        drenar_efectos()  # Terminar notificaciones/logs pendientes antes de salir
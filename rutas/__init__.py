@@ -0,0 +1,14 @@
+# rutas/__init__.py
+"""Blueprints de la aplicación; create_app() (app.py) los registra con register_blueprints()."""
+
+from rutas.principal import principal_bp
+from rutas.usuario import usuario_bp
+from rutas.tecnico import tecnico_bp
+from rutas.ticket import ticket_bp
+
+BLUEPRINTS = (principal_bp, usuario_bp, tecnico_bp, ticket_bp)
+
+
+def register_blueprints(app):
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
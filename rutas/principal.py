@@ -0,0 +1,57 @@
+# rutas/principal.py
+"""Login, logout y descarga de adjuntos."""
+
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, session, flash, send_from_directory
+from modelos import db, Usuario
+from utilidades import login_required
+from compresion import sin_compresion, sin_etag
+from seguridad import verificar_password, generar_hash, necesita_rehash, ServidorOcupado, limitador_rut, limitador_ip
+
+principal_bp = Blueprint('principal', __name__)
+
+# --- RUTAS ---
+@principal_bp.route("/", methods=["GET", "POST"])
+def index():
+    if "usuario_id" in session:
+        return redirect(url_for("tecnico.tecnico_dashboard") if session.get("rol") in ["Técnico Nivel 1", "Técnico Nivel 2"] else url_for("usuario.usuario_dashboard"))
+    if request.method == "POST":
+        rut, password = request.form["rut"], request.form["password"]
+        ip = request.remote_addr or 'desconocida'
+        if not (limitador_rut.consumir(rut) and limitador_ip.consumir(ip)):
+            espera = max(limitador_rut.segundos_restantes(rut), limitador_ip.segundos_restantes(ip))
+            flash(f"Demasiados intentos de inicio de sesión. Intenta nuevamente en {espera} segundos.", "danger")
+            return render_template("index.html"), 429
+        usuario_en_db = Usuario.query.filter_by(rut=rut, eliminado=False).first()
+        try:
+            password_valida = usuario_en_db is not None and verificar_password(usuario_en_db.password, password)
+        except ServidorOcupado:
+            flash("El servidor está ocupado, intenta nuevamente en unos segundos.", "warning")
+            return render_template("index.html"), 503
+        if password_valida:
+            # Rehash transparente si el hash quedó con parámetros antiguos
+            if necesita_rehash(usuario_en_db.password):
+                try:
+                    usuario_en_db.password = generar_hash(password)
+                    db.session.commit()
+                except ServidorOcupado:
+                    pass  # Se reintenta en el próximo login
+            session.update({"usuario_id": usuario_en_db.id, "usuario_nombre": usuario_en_db.nombre, "rol": usuario_en_db.rol})
+            flash(f"Bienvenido {usuario_en_db.nombre}", "success")
+            return redirect(url_for("tecnico.tecnico_dashboard") if usuario_en_db.rol in ["Técnico Nivel 1", "Técnico Nivel 2"] else url_for("usuario.usuario_dashboard"))
+        else:
+            flash("RUT o contraseña incorrectos", "danger")
+    return render_template("index.html")
+
+@principal_bp.route("/logout")
+@login_required
+def logout():
+    session.clear()
+    flash("Sesión cerrada correctamente", "info")
+    return redirect(url_for("principal.index"))
+
+@principal_bp.route('/uploads/<path:filename>')
+@login_required
+@sin_compresion
+@sin_etag
+def download_file(filename):
+    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename, as_attachment=True)
@@ -0,0 +1,306 @@
+# rutas/tecnico.py
+"""Panel de técnicos: bandejas, mantenedores, calendario, reportes, usuarios y auditoría."""
+
+import io
+from datetime import datetime, timedelta
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, send_file, make_response, jsonify
+from sqlalchemy import or_, func
+from modelos import db, Usuario, Categoria, Ticket, Activo, Articulo, LogAuditoria, TicketArchivo, tickets_con_archivo
+from efectos import encolar_efecto
+from compresion import etag_por_version, no_modificado
+from seguridad import generar_hash, ServidorOcupado
+from utilidades import login_required, role_required, registrar_log, es_dia_habil
+from directorio import buscar_usuarios, invalidar_directorio
+
+tecnico_bp = Blueprint('tecnico', __name__)
+
+# --- RUTAS DE TÉCNICO ---
+@tecnico_bp.route("/tecnico")
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def tecnico_dashboard():
+    tickets_cerrados = Ticket.query.filter_by(estado='Cerrado').all()
+    total_cerrados = len(tickets_cerrados)
+    cumplidos = sum(1 for ticket in tickets_cerrados if ticket.fecha_cierre and ticket.fecha_vencimiento_sla and ticket.fecha_cierre <= ticket.fecha_vencimiento_sla)
+    sla_percent = round((cumplidos / total_cerrados) * 100) if total_cerrados > 0 else 100
+    stats = {'pendientes': Ticket.query.filter_by(estado='Abierto').count(), 'en_proceso': Ticket.query.filter_by(estado='En Proceso').count(), 'cerrados_hoy': total_cerrados, 'sla_cumplido': sla_percent}
+    tickets_por_estado = db.session.query(Ticket.estado, func.count(Ticket.id)).group_by(Ticket.estado).all()
+    tickets_por_categoria = db.session.query(Categoria.nombre, func.count(Ticket.id)).join(Ticket).group_by(Categoria.nombre).all()
+    chart_data = {'estados_labels': [item[0] for item in tickets_por_estado], 'estados_data': [item[1] for item in tickets_por_estado], 'categorias_labels': [item[0] for item in tickets_por_categoria], 'categorias_data': [item[1] for item in tickets_por_categoria]}
+    
+    # Verificamos si hoy es feriado para mostrar alerta en dashboard
+    es_feriado_hoy = not es_dia_habil(datetime.now())
+    
+    return render_template("tecnico/tecnico_dashboard.html", stats=stats, chart_data=chart_data, es_feriado=es_feriado_hoy)
+
+@tecnico_bp.route("/tecnico/todos")
+@login_required
+@role_required(['Técnico Nivel 2'])
+def tecnico_todos_tickets():
+    page = request.args.get('page', 1, type=int)
+    filters = {'search': request.args.get('search', ''), 'estado': request.args.get('estado', ''), 'prioridad': request.args.get('prioridad', ''), 'categoria_id': request.args.get('categoria_id', '')}
+    # Las búsquedas y el filtro "Cerrado" también miran el archivo; el listado por defecto solo la tabla caliente
+    T = tickets_con_archivo() if filters['search'] or filters['estado'] == 'Cerrado' else Ticket
+    query = db.session.query(T)
+    if filters['search']: query = query.filter(or_(T.asunto.ilike(f"%{filters['search']}%"), T.descripcion_texto.ilike(f"%{filters['search']}%")))
+    if filters['estado']: query = query.filter_by(estado=filters['estado'])
+    if filters['prioridad']: query = query.filter_by(prioridad=filters['prioridad'])
+    if filters['categoria_id']: query = query.filter_by(categoria_id=filters['categoria_id'])
+    pagination = query.order_by(T.fecha_creacion.desc()).paginate(page=page, per_page=10)
+    categorias = Categoria.query.order_by(Categoria.nombre).all()
+    return render_template("tecnico/tecnico_todos_tickets.html", pagination=pagination, categorias=categorias, filters=filters)
+
+@tecnico_bp.route("/tecnico/mis-asignados")
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def tecnico_mis_asignados():
+    page = request.args.get('page', 1, type=int)
+    tecnico_id = session.get('usuario_id')
+    filters = {'search': request.args.get('search', ''), 'estado': request.args.get('estado', '')}
+    T = tickets_con_archivo() if filters['search'] or filters['estado'] == 'Cerrado' else Ticket
+    query = db.session.query(T).filter_by(tecnico_id=tecnico_id)
+    if filters['search']: query = query.filter(T.asunto.ilike(f"%{filters['search']}%"))
+    if filters['estado']: query = query.filter_by(estado=filters['estado'])
+    pagination = query.order_by(T.fecha_creacion.desc()).paginate(page=page, per_page=10)
+    return render_template("tecnico/tecnico_ver_tickets.html", pagination=pagination, filters=filters)
+
+@tecnico_bp.route("/tecnico/categorias", methods=["GET", "POST"])
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def tecnico_categorias():
+    if request.method == "POST":
+        nueva_categoria = Categoria(nombre=request.form['nombre'], descripcion=request.form['descripcion'], sla_respuesta=request.form['sla_respuesta'], sla_resolucion=request.form['sla_resolucion'])
+        db.session.add(nueva_categoria); db.session.commit(); flash('Categoría creada con éxito.', 'success')
+        return redirect(url_for('tecnico.tecnico_categorias'))
+    categorias = Categoria.query.order_by(Categoria.nombre).all()
+    return render_template('tecnico/tecnico_categorias.html', categorias=categorias)
+
+@tecnico_bp.route("/tecnico/categorias/editar", methods=["POST"])
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def editar_categoria():
+    categoria = Categoria.query.get_or_404(request.form.get('id_categoria_edit'))
+    categoria.nombre, categoria.descripcion, categoria.sla_respuesta, categoria.sla_resolucion = request.form['nombre_edit'], request.form['descripcion_edit'], request.form['sla_respuesta_edit'], request.form['sla_resolucion_edit']
+    db.session.commit(); flash('Categoría actualizada con éxito.', 'success')
+    return redirect(url_for('tecnico.tecnico_categorias'))
+
+@tecnico_bp.route("/tecnico/categorias/eliminar", methods=["POST"])
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def eliminar_categoria():
+    categoria = Categoria.query.get_or_404(request.form.get('id_categoria_delete'))
+    # La FK es ON DELETE RESTRICT: una categoría con tickets (activos o archivados) no se puede borrar
+    en_uso = db.session.query(Ticket.query.filter_by(categoria_id=categoria.id).exists()).scalar() or \
+             db.session.query(TicketArchivo.query.filter_by(categoria_id=categoria.id).exists()).scalar()
+    if en_uso:
+        flash('No se puede eliminar la categoría porque tiene tickets asociados.', 'warning')
+        return redirect(url_for('tecnico.tecnico_categorias'))
+    db.session.delete(categoria); db.session.commit(); flash('Categoría eliminada con éxito.', 'danger')
+    return redirect(url_for('tecnico.tecnico_categorias'))
+
+@tecnico_bp.route("/tecnico/inventario", methods=["GET", "POST"])
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def tecnico_inventario():
+    if request.method == "POST":
+        asignado_id = request.form.get('asignado_a_id')
+        nuevo = Activo(tipo=request.form['tipo'], marca=request.form['marca'], modelo=request.form['modelo'], numero_serie=request.form['numero_serie'], asignado_a_id=int(asignado_id) if asignado_id else None)
+        db.session.add(nuevo); db.session.commit(); flash('Activo creado con éxito.', 'success')
+        return redirect(url_for('tecnico.tecnico_inventario'))
+    page = request.args.get('page', 1, type=int)
+    query = Activo.query
+    filters = {'search': request.args.get('search', ''), 'asignado_a_id': request.args.get('asignado_a_id', '')}
+    if filters['search']: query = query.filter(or_(Activo.tipo.ilike(f"%{filters['search']}%"), Activo.marca.ilike(f"%{filters['search']}%"), Activo.modelo.ilike(f"%{filters['search']}%")))
+    if filters['asignado_a_id']: query = query.filter_by(asignado_a_id=filters['asignado_a_id'])
+    pagination = query.order_by(Activo.tipo).paginate(page=page, per_page=10)
+    # Los selectores de usuario usan la búsqueda typeahead; solo se carga el del filtro activo
+    asignado_filtro = db.session.get(Usuario, int(filters['asignado_a_id'])) if filters['asignado_a_id'].isdigit() else None
+    return render_template("tecnico/tecnico_inventario.html", pagination=pagination, asignado_filtro=asignado_filtro, filters=filters)
+
+@tecnico_bp.route("/tecnico/inventario/editar", methods=["POST"])
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def editar_activo():
+    activo = Activo.query.get_or_404(request.form.get('id_activo_edit'))
+    asignado_id = request.form.get('asignado_a_id_edit')
+    activo.tipo, activo.marca, activo.modelo, activo.numero_serie = request.form['tipo_edit'], request.form['marca_edit'], request.form['modelo_edit'], request.form['numero_serie_edit']
+    activo.asignado_a_id = int(asignado_id) if asignado_id else None
+    db.session.commit(); flash('Activo actualizado con éxito.', 'success')
+    return redirect(url_for('tecnico.tecnico_inventario'))
+
+@tecnico_bp.route("/tecnico/inventario/eliminar", methods=["POST"])
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def eliminar_activo():
+    activo = Activo.query.get_or_404(request.form.get('id_activo_delete'))
+    db.session.delete(activo); db.session.commit(); flash('Activo eliminado con éxito.', 'danger')
+    return redirect(url_for('tecnico.tecnico_inventario'))
+
+@tecnico_bp.route("/tecnico/faq/gestion", methods=["GET", "POST"])
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def tecnico_faq_gestion():
+    if request.method == "POST":
+        from sugerencias import indexar_articulo
+        nuevo_articulo = Articulo(titulo=request.form['titulo'], contenido=request.form['contenido'], categoria_faq=request.form['categoria_faq'])
+        db.session.add(nuevo_articulo); db.session.flush()
+        encolar_efecto(indexar_articulo, nuevo_articulo.id)  # Índice de sugerencias al día sin reconstruirlo
+        db.session.commit(); flash('Artículo creado con éxito.', 'success')
+        return redirect(url_for('tecnico.tecnico_faq_gestion'))
+    articulos = Articulo.query.order_by(Articulo.titulo).all()
+    return render_template("tecnico/tecnico_faq_gestion.html", articulos=articulos)
+
+@tecnico_bp.route("/tecnico/faq/editar", methods=["POST"])
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def editar_articulo():
+    articulo = Articulo.query.get_or_404(request.form.get('id_articulo_edit'))
+    articulo.titulo, articulo.contenido, articulo.categoria_faq = request.form['titulo_edit'], request.form['contenido_edit'], request.form['categoria_faq_edit']
+    from sugerencias import indexar_articulo
+    encolar_efecto(indexar_articulo, articulo.id)
+    db.session.commit(); flash('Artículo actualizado con éxito.', 'success')
+    return redirect(url_for('tecnico.tecnico_faq_gestion'))
+
+@tecnico_bp.route("/tecnico/faq/eliminar", methods=["POST"])
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def eliminar_articulo():
+    articulo = Articulo.query.get_or_404(request.form.get('id_articulo_delete'))
+    from sugerencias import indexar_articulo
+    encolar_efecto(indexar_articulo, articulo.id)
+    db.session.delete(articulo); db.session.commit(); flash('Artículo eliminado con éxito.', 'danger')
+    return redirect(url_for('tecnico.tecnico_faq_gestion'))
+
+@tecnico_bp.route("/tecnico/calendario")
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def tecnico_calendario():
+    # Versión del calendario: si ningún ticket cambió desde la última visita, 304 sin consultar ni renderizar
+    total, max_id, max_actualizacion = db.session.query(func.count(Ticket.id), func.max(Ticket.id), func.max(Ticket.fecha_actualizacion)).one()
+    etag = etag_por_version('calendario', session['usuario_id'], total, max_id, max_actualizacion)
+    respuesta = no_modificado(etag)
+    if respuesta:
+        return respuesta
+    tickets = Ticket.query.all()
+    eventos = []
+    for t in tickets:
+        color = '#dc3545' if t.estado == 'Abierto' else '#ffc107' if t.estado == 'En Proceso' else '#198754'
+        eventos.append({
+            'title': f"#{t.id} {t.asunto}",
+            'start': t.fecha_creacion.isoformat(),
+            'url': url_for('ticket.ticket_detalle', ticket_id=t.id),
+            'color': color
+        })
+    respuesta = make_response(render_template("tecnico/tecnico_calendario.html", eventos=eventos))
+    respuesta.headers['ETag'] = etag
+    respuesta.headers['Cache-Control'] = 'private, no-cache'
+    return respuesta
+
+@tecnico_bp.route("/tecnico/reportes")
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def tecnico_reportes():
+    tecnicos = db.session.query(Usuario.nombre, func.count(Ticket.id)).join(Ticket, Ticket.tecnico_id == Usuario.id).filter(Ticket.estado == 'Cerrado').group_by(Usuario.nombre).all()
+    categorias = db.session.query(Categoria.nombre, func.count(Ticket.id)).join(Ticket).group_by(Categoria.nombre).all()
+    estados = db.session.query(Ticket.estado, func.count(Ticket.id)).group_by(Ticket.estado).all()
+    chart_data = {
+        'tecnicos_labels': [t[0] for t in tecnicos], 'tecnicos_data': [t[1] for t in tecnicos],
+        'categorias_labels': [c[0] for c in categorias], 'categorias_data': [c[1] for c in categorias],
+        'estados_labels': [e[0] for e in estados], 'estados_data': [e[1] for e in estados]
+    }
+    from analitica import metricas_cacheadas, rango_desde_args  # pandas solo se carga al usar reportes
+    desde, hasta = rango_desde_args(request.args)
+    metricas = metricas_cacheadas(desde, hasta)
+    rango = {'desde': desde.strftime('%Y-%m-%d'), 'hasta': (hasta - timedelta(days=1)).strftime('%Y-%m-%d')}
+    return render_template("tecnico/tecnico_reportes.html", chart_data=chart_data, metricas=metricas, rango=rango)
+
+@tecnico_bp.route("/tecnico/usuarios", methods=["GET", "POST"])
+@login_required
+@role_required(['Técnico Nivel 2'])
+def tecnico_usuarios():
+    if request.method == "POST":
+        try:
+            hashed_password = generar_hash(request.form['password'])
+        except ServidorOcupado:
+            flash('El servidor está ocupado, intenta nuevamente en unos segundos.', 'warning')
+            return redirect(url_for('tecnico.tecnico_usuarios'))
+        nuevo = Usuario(rut=request.form['rut'], nombre=request.form['nombre'], email=request.form['email'], password=hashed_password, rol=request.form['rol'])
+        db.session.add(nuevo)
+        registrar_log('Crear Usuario', f"Se creó al usuario {nuevo.nombre} con RUT {nuevo.rut} y rol {nuevo.rol}")
+        db.session.commit(); invalidar_directorio(); flash('Usuario creado con éxito.', 'success')
+        return redirect(url_for('tecnico.tecnico_usuarios'))
+    page = request.args.get('page', 1, type=int)
+    query = Usuario.query.filter_by(eliminado=False)
+    filters = {'search': request.args.get('search', ''), 'rol': request.args.get('rol', '')}
+    if filters['search']: query = query.filter(or_(Usuario.nombre.ilike(f"%{filters['search']}%"), Usuario.email.ilike(f"%{filters['search']}%")))
+    if filters['rol']: query = query.filter_by(rol=filters['rol'])
+    pagination = query.order_by(Usuario.nombre).paginate(page=page, per_page=10)
+    return render_template("tecnico/tecnico_usuarios.html", pagination=pagination, filters=filters)
+
+@tecnico_bp.route("/tecnico/usuarios/editar", methods=["POST"])
+@login_required
+@role_required(['Técnico Nivel 2'])
+def editar_usuario():
+    usuario = Usuario.query.get_or_404(request.form.get('id_usuario_edit'))
+    usuario.rut, usuario.nombre, usuario.email, usuario.rol = request.form['rut_edit'], request.form['nombre_edit'], request.form['email_edit'], request.form['rol_edit']
+    registrar_log('Editar Usuario', f"Se editó al usuario ID {usuario.id}: {usuario.nombre}")
+    db.session.commit(); invalidar_directorio(); flash('Usuario actualizado con éxito.', 'success')
+    return redirect(url_for('tecnico.tecnico_usuarios'))
+
+@tecnico_bp.route("/tecnico/usuarios/eliminar", methods=["POST"])
+@login_required
+@role_required(['Técnico Nivel 2'])
+def eliminar_usuario():
+    usuario_id = int(request.form.get('id_usuario_delete'))
+    if usuario_id == session.get('usuario_id'):
+        flash('No puedes eliminarte a ti mismo.', 'danger')
+        return redirect(url_for('tecnico.tecnico_usuarios'))
+    usuario = Usuario.query.get_or_404(usuario_id)
+    registrar_log('Eliminar Usuario', f"Se eliminó al usuario {usuario.nombre} (RUT: {usuario.rut})")
+    # Borrado lógico inmediato; tickets, comentarios y notificaciones se purgan por lotes después del commit
+    from purga import purgar_usuario
+    usuario.eliminado, usuario.fecha_eliminacion = True, datetime.utcnow()
+    encolar_efecto(purgar_usuario, usuario.id, clave=f"purgar-usuario-{usuario.id}")
+    db.session.commit(); invalidar_directorio(); flash('Usuario eliminado con éxito.', 'danger')
+    return redirect(url_for('tecnico.tecnico_usuarios'))
+
+@tecnico_bp.route("/tecnico/usuarios/buscar")
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def buscar_usuarios_json():
+    """JSON para los selectores typeahead: ?q=<prefijo de nombre, RUT o email>&rol=<rol>&limite=<n>."""
+    usuarios = buscar_usuarios(request.args.get('q', ''), roles=request.args.getlist('rol'),
+                               limite=request.args.get('limite', 10, type=int))
+    return jsonify({'usuarios': usuarios})
+
+@tecnico_bp.route("/tecnico/auditoria")
+@login_required
+@role_required(['Técnico Nivel 2'])
+def tecnico_auditoria():
+    page = request.args.get('page', 1, type=int)
+    logs = LogAuditoria.query.order_by(LogAuditoria.fecha.desc()).paginate(page=page, per_page=20)
+    return render_template("tecnico/tecnico_auditoria.html", pagination=logs)
+
+@tecnico_bp.route("/tecnico/reportes/exportar")
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def exportar_reporte():
+    tickets = db.session.query(tickets_con_archivo()).all()  # Reporte histórico completo
+    data = []
+    for t in tickets:
+        data.append({
+            'ID': t.id, 'Asunto': t.asunto, 'Descripción': t.descripcion_texto, 'Estado': t.estado, 'Prioridad': t.prioridad,
+            'Creador': t.creador.nombre if t.creador else 'N/A',
+            'Técnico': t.tecnico_asignado.nombre if t.tecnico_asignado else 'Sin asignar',
+            'Categoría': t.categoria.nombre,
+            'Fecha Creación': t.fecha_creacion.strftime('%Y-%m-%d %H:%M'),
+            'Fecha Cierre': t.fecha_cierre.strftime('%Y-%m-%d %H:%M') if t.fecha_cierre else ''
+        })
+    import pandas as pd  # Dependencia pesada: solo la paga quien exporta
+    df = pd.DataFrame(data)
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='Tickets')
+    output.seek(0)
+    filename = f"reporte_tickets_{datetime.now().strftime('%Y%m%d')}.xlsx"
+    return send_file(output, download_name=filename, as_attachment=True, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
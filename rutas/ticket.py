@@ -0,0 +1,141 @@
+# rutas/ticket.py
+"""Detalle de ticket, hilo de comentarios y acciones de los técnicos sobre el ticket."""
+
+from datetime import datetime
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, abort
+from sqlalchemy.orm import joinedload
+from markupsafe import Markup, escape
+from modelos import db, Usuario, Ticket, Notificacion, Comentario, TicketArchivo, ComentarioArchivo
+from efectos import encolar_efecto
+from utilidades import login_required, role_required, registrar_log, usuario_actual
+
+ticket_bp = Blueprint('ticket', __name__)
+
+# --- RUTAS DE TICKET ---
+COMENTARIOS_POR_PAGINA = 20
+
+def obtener_comentarios(ticket_id, antes_id=None, limite=COMENTARIOS_POR_PAGINA, modelo=Comentario):
+    """Página del hilo con paginación keyset por id. Devuelve (comentarios en orden cronológico, hay_mas)."""
+    query = modelo.query.options(joinedload(modelo.autor)).filter(modelo.ticket_id == ticket_id)
+    if antes_id:
+        query = query.filter(modelo.id < antes_id)
+    filas = query.order_by(modelo.id.desc()).limit(limite + 1).all()
+    return list(reversed(filas[:limite])), len(filas) > limite
+
+def puede_ver_ticket(ticket):
+    return session['rol'] != 'Usuario' or ticket.usuario_id == session['usuario_id']
+
+@ticket_bp.route("/ticket/<int:ticket_id>", methods=["GET", "POST"])
+@login_required
+def ticket_detalle(ticket_id):
+    # Una sola consulta con todo lo que la plantilla necesita del ticket; si no está, se busca en el archivo
+    archivado = False
+    for modelo in (Ticket, TicketArchivo):
+        ticket = modelo.query.options(
+            joinedload(modelo.creador), joinedload(modelo.tecnico_asignado),
+            joinedload(modelo.categoria), joinedload(modelo.adjuntos)
+        ).filter(modelo.id == ticket_id).first()
+        if ticket:
+            archivado = modelo is TicketArchivo
+            break
+    else:
+        abort(404)
+    if not puede_ver_ticket(ticket):
+        flash("No tienes permiso para ver este ticket.", "danger")
+        return redirect(url_for('usuario.usuario_mis_tickets'))
+    if request.method == 'POST':
+        if ticket.estado == 'Cerrado':
+            flash("No se pueden añadir comentarios a un ticket cerrado.", "warning")
+            return redirect(url_for('ticket.ticket_detalle', ticket_id=ticket.id))
+        contenido = request.form.get("contenido")
+        if contenido:
+            comentario = Comentario(contenido=contenido, ticket_id=ticket.id, usuario_id=session.get('usuario_id'))
+            db.session.add(comentario)
+            autor = usuario_actual()
+            if autor.rol == 'Usuario' and ticket.tecnico_id:
+                notificacion = Notificacion(mensaje=f"Hay una nueva respuesta en el ticket #{ticket.id}.", usuario_id=ticket.tecnico_id, ticket_id=ticket.id)
+                db.session.add(notificacion)
+            elif autor.rol in ["Técnico Nivel 1", "Técnico Nivel 2"]:
+                notificacion = Notificacion(mensaje=f"Un técnico ha respondido a tu ticket #{ticket.id}.", usuario_id=ticket.usuario_id, ticket_id=ticket.id)
+                db.session.add(notificacion)
+            db.session.commit()
+        return redirect(url_for('ticket.ticket_detalle', ticket_id=ticket.id))
+    comentarios, hay_mas_comentarios = obtener_comentarios(ticket.id, modelo=ComentarioArchivo if archivado else Comentario)
+    # Los modales de escalar/reasignar buscan técnicos con el typeahead (tecnico.buscar_usuarios_json)
+    return render_template("ticket_detalle.html", ticket=ticket, comentarios=comentarios, hay_mas_comentarios=hay_mas_comentarios, archivado=archivado)
+
+@ticket_bp.route("/ticket/<int:ticket_id>/comentarios")
+@login_required
+def ticket_comentarios(ticket_id):
+    """JSON con comentarios anteriores a ?antes=<id> para el botón "Cargar anteriores"."""
+    ticket = db.session.query(Ticket.id, Ticket.usuario_id).filter(Ticket.id == ticket_id).first()
+    modelo = Comentario
+    if ticket is None:
+        ticket = db.session.query(TicketArchivo.id, TicketArchivo.usuario_id).filter(TicketArchivo.id == ticket_id).first_or_404()
+        modelo = ComentarioArchivo
+    if not puede_ver_ticket(ticket):
+        return jsonify({'error': 'No tienes permiso para ver este ticket.'}), 403
+    comentarios, hay_mas = obtener_comentarios(ticket_id, antes_id=request.args.get('antes', type=int), modelo=modelo)
+    return jsonify({
+        'comentarios': [{
+            'id': c.id, 'contenido': c.contenido_html if c.contenido_html is not None else str(escape(Markup(c.contenido).striptags())),
+            'autor_nombre': c.autor.nombre, 'autor_rol': c.autor.rol,
+            'fecha': c.fecha_creacion.strftime('%d-%m-%Y %H:%M')
+        } for c in comentarios],
+        'hay_mas': hay_mas
+    })
+
+@ticket_bp.route("/ticket/<int:ticket_id>/asignar")
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def asignar_ticket(ticket_id):
+    ticket, tecnico = Ticket.query.get_or_404(ticket_id), usuario_actual()
+    ticket.tecnico_id = tecnico.id
+    registrar_log('Asignar Ticket', f"El técnico {tecnico.nombre} se auto-asignó el ticket #{ticket.id}")
+    notificacion = Notificacion(mensaje=f"El técnico {tecnico.nombre} ha tomado tu ticket #{ticket.id}.", usuario_id=ticket.usuario_id, ticket_id=ticket.id)
+    db.session.add(notificacion); db.session.commit(); flash(f"Te has asignado el ticket #{ticket.id}", "success")
+    return redirect(url_for('ticket.ticket_detalle', ticket_id=ticket.id))
+
+@ticket_bp.route("/ticket/<int:ticket_id>/reasignar", methods=["POST"])
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def reasignar_ticket(ticket_id):
+    ticket = Ticket.query.get_or_404(ticket_id)
+    nuevo_tecnico_id = request.form.get('tecnico_id', type=int)
+    # El id llega desde el typeahead: se valida que sea un técnico vigente
+    nuevo_tecnico = db.session.get(Usuario, nuevo_tecnico_id) if nuevo_tecnico_id else None
+    if nuevo_tecnico is None or nuevo_tecnico.eliminado or not nuevo_tecnico.rol.startswith('Técnico'):
+        flash("Debes seleccionar un técnico.", "warning")
+        return redirect(url_for('ticket.ticket_detalle', ticket_id=ticket.id))
+    tecnico_actual_id = ticket.tecnico_id
+    ticket.tecnico_id = nuevo_tecnico_id
+    registrar_log('Reasignar Ticket', f"Ticket #{ticket.id} reasignado a {nuevo_tecnico.nombre}")
+    notif_nuevo = Notificacion(mensaje=f"Se te ha reasignado el ticket #{ticket.id}.", usuario_id=nuevo_tecnico_id, ticket_id=ticket.id)
+    db.session.add(notif_nuevo)
+    if tecnico_actual_id and int(tecnico_actual_id) != int(nuevo_tecnico_id):
+        notif_anterior = Notificacion(mensaje=f"El ticket #{ticket.id} fue reasignado a {nuevo_tecnico.nombre}.", usuario_id=tecnico_actual_id, ticket_id=ticket.id)
+        db.session.add(notif_anterior)
+    db.session.commit()
+    flash(f"Ticket reasignado a {nuevo_tecnico.nombre} con éxito.", "success")
+    return redirect(url_for('ticket.ticket_detalle', ticket_id=ticket.id))
+
+@ticket_bp.route("/ticket/<int:ticket_id>/estado", methods=["POST"])
+@login_required
+@role_required(['Técnico Nivel 1', 'Técnico Nivel 2'])
+def cambiar_estado_ticket(ticket_id):
+    ticket, nuevo_estado = Ticket.query.get_or_404(ticket_id), request.form.get('nuevo_estado')
+    if ticket.estado != nuevo_estado:
+        estado_anterior = ticket.estado
+        ticket.estado = nuevo_estado
+        if nuevo_estado == 'Cerrado':
+            ticket.fecha_cierre = datetime.utcnow()
+        else:
+            ticket.fecha_cierre = None
+        registrar_log('Cambio Estado Ticket', f"Ticket #{ticket.id} cambió de {estado_anterior} a {nuevo_estado}")
+        notificacion = Notificacion(mensaje=f"El estado de tu ticket #{ticket.id} ha cambiado a '{nuevo_estado}'.", usuario_id=ticket.usuario_id, ticket_id=ticket.id)
+        db.session.add(notificacion)
+        from sugerencias import indexar_ticket
+        encolar_efecto(indexar_ticket, ticket.id)  # Un ticket cerrado deja de sugerirse como duplicado
+        db.session.commit()
+        flash(f"El estado del ticket ha sido actualizado a '{nuevo_estado}'.", "info")
+    return redirect(url_for('ticket.ticket_detalle', ticket_id=ticket.id))
@@ -0,0 +1,136 @@
+# rutas/usuario.py
+"""Portal del usuario final: dashboard, creación de tickets, notificaciones y FAQ."""
+
+import os
+from datetime import datetime, timedelta
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, session, flash, jsonify
+from sqlalchemy import or_
+from werkzeug.utils import secure_filename
+from modelos import db, Categoria, Ticket, Notificacion, Articulo, Adjunto, tickets_con_archivo
+from efectos import encolar_efecto
+from utilidades import (login_required, role_required, allowed_file, calcular_vencimiento_realista,
+                        registrar_log_diferido, efecto_asignar_tecnico)
+
+usuario_bp = Blueprint('usuario', __name__)
+
+# --- RUTAS DE USUARIO ---
+@usuario_bp.route("/usuario")
+@login_required
+@role_required(['Usuario'])
+def usuario_dashboard():
+    user_id = session.get('usuario_id')
+    T = tickets_con_archivo()  # Los cerrados archivados siguen contando en el historial del usuario
+    contadores = {
+        'abiertos': db.session.query(T).filter(T.usuario_id == user_id, or_(T.estado == 'Abierto', T.estado == 'En Proceso')).count(),
+        'cerrados': db.session.query(T).filter(T.usuario_id == user_id, T.estado == 'Cerrado').count(),
+        'total': db.session.query(T).filter(T.usuario_id == user_id).count()
+    }
+    return render_template("usuario/usuario_dashboard.html", contadores=contadores)
+
+@usuario_bp.route("/usuario/crear", methods=["GET", "POST"])
+@login_required
+@role_required(['Usuario'])
+def usuario_crear_ticket():
+    if request.method == "POST":
+        categoria_id = request.form.get('categoria_id')
+        categoria = Categoria.query.get(categoria_id)
+        if not categoria:
+            flash("Categoría no válida.", "danger")
+            return redirect(url_for('usuario.usuario_crear_ticket'))
+        
+        # --- CAMBIO PRINCIPAL: CÁLCULO SLA CON API ---
+        # En lugar de sumar horas simples, usamos la función inteligente
+        fecha_vencimiento_calculada = calcular_vencimiento_realista(categoria.sla_resolucion)
+        
+        # Comparamos para ver si se extendió (solo para feedback visual)
+        fecha_simple = datetime.utcnow() + timedelta(hours=categoria.sla_resolucion)
+        se_extendio = fecha_vencimiento_calculada > (fecha_simple + timedelta(hours=1)) # Margen de 1h
+
+        nuevo_ticket = Ticket(
+            asunto=request.form.get('asunto'), categoria_id=categoria_id, prioridad=request.form.get('prioridad'),
+            descripcion=request.form.get('descripcion'), usuario_id=session.get('usuario_id'), 
+            fecha_vencimiento_sla=fecha_vencimiento_calculada,
+            es_sla_extendido=se_extendio # Guardamos si usó feriados
+        )
+        db.session.add(nuevo_ticket)
+        db.session.flush()  # Necesitamos el ID para el adjunto y los efectos
+        file = request.files.get('adjunto')
+        if file and file.filename != '' and allowed_file(file.filename):
+            filename = secure_filename(file.filename)
+            new_filename = f"{nuevo_ticket.id}_{filename}"
+            file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], new_filename))
+            nuevo_adjunto = Adjunto(nombre_archivo=new_filename, ticket_id=nuevo_ticket.id)
+            db.session.add(nuevo_adjunto)
+
+        # Asignación Round Robin, notificación y log se ejecutan después del commit, fuera del request
+        encolar_efecto(efecto_asignar_tecnico, nuevo_ticket.id, clave=f"asignar-ticket-{nuevo_ticket.id}")
+        from sugerencias import indexar_ticket
+        encolar_efecto(indexar_ticket, nuevo_ticket.id)
+        if se_extendio:
+            msg_log = f"Ticket #{nuevo_ticket.id} creado. SLA extendido automáticamente por Feriados/Fin de semana."
+        else:
+            msg_log = f"Ticket #{nuevo_ticket.id} creado."
+        registrar_log_diferido("Crear Ticket", msg_log)
+
+        db.session.commit()
+        flash("Ticket creado con éxito. Será asignado a un técnico en breve.", "success")
+        if se_extendio:
+            flash("Aviso: La fecha de vencimiento se ajustó considerando días feriados o fines de semana.", "info")
+            
+        return redirect(url_for('usuario.usuario_mis_tickets'))
+    categorias = Categoria.query.order_by(Categoria.nombre).all()
+    return render_template("usuario/usuario_crear_ticket.html", categorias=categorias)
+
+@usuario_bp.route("/usuario/mis-tickets")
+@login_required
+@role_required(['Usuario'])
+def usuario_mis_tickets():
+    user_id = session.get('usuario_id')
+    T = tickets_con_archivo()
+    mis_tickets = db.session.query(T).filter(T.usuario_id == user_id).order_by(T.fecha_creacion.desc()).all()
+    return render_template("usuario/usuario_mis_tickets.html", tickets=mis_tickets)
+
+@usuario_bp.route("/usuario/notificaciones")
+@login_required
+@role_required(['Usuario'])
+def usuario_notificaciones():
+    user_id = session.get('usuario_id')
+    notificaciones = Notificacion.query.filter_by(usuario_id=user_id).order_by(Notificacion.fecha_creacion.desc()).all()
+    for notif in notificaciones: notif.leida = True
+    db.session.commit()
+    return render_template("usuario/usuario_notificaciones.html", notificaciones=notificaciones)
+
+@usuario_bp.route("/usuario/faq")
+@login_required
+@role_required(['Usuario'])
+def usuario_faq():
+    query = request.args.get('query', '')
+    if query:
+        articulos = Articulo.query.filter(or_(Articulo.titulo.ilike(f'%{query}%'), Articulo.contenido.ilike(f'%{query}%'))).all()
+    else:
+        articulos = Articulo.query.order_by(Articulo.fecha_creacion.desc()).all()
+    return render_template("usuario/usuario_faq.html", articulos=articulos, query=query)
+
+@usuario_bp.route("/usuario/sugerencias")
+@login_required
+@role_required(['Usuario'])
+def usuario_sugerencias():
+    """JSON con artículos de FAQ y tickets abiertos parecidos al asunto que se está escribiendo."""
+    from sugerencias import sugerir  # numpy/scipy solo se cargan al usar sugerencias
+    asunto = request.args.get('asunto', '').strip()[:200]
+    k = min(max(request.args.get('k', 5, type=int), 1), 10)
+    articulos, tickets = sugerir(asunto, k=k) if asunto else ([], [])
+    user_id = session.get('usuario_id')
+    # Los tickets de otros usuarios solo se cuentan: sus asuntos no se exponen
+    propios = [t for t, _ in tickets if t['usuario_id'] == user_id]
+    return jsonify({
+        'articulos': [{
+            'id': a['id'], 'titulo': a['titulo'], 'categoria_faq': a['categoria_faq'], 'puntaje': round(puntaje, 3),
+            'url': url_for('usuario.usuario_faq', query=a['titulo'])
+        } for a, puntaje in articulos],
+        'tickets': [{
+            'id': t['id'], 'asunto': t['asunto'], 'estado': t['estado'],
+            'url': url_for('ticket.ticket_detalle', ticket_id=t['id'])
+        } for t in propios],
+        'otros_similares': len(tickets) - len(propios)
+    })
@@ -1,6 +1,8 @@
 # seed.py
 
-from app import app, db, Usuario, Categoria, Ticket, Activo, get_next_technician_id
+from app import create_app
+from modelos import db, Usuario, Categoria, Ticket, Activo
+from utilidades import get_next_technician_id
 from faker import Faker
 from werkzeug.security import generate_password_hash
 import random
@@ -47,7 +49,7 @@ def generar_email(nombre):
 
 def run_seed():
     """Borra la BD y la llena con datos coherentes y realistas."""
-    with app.app_context():
+    with create_app().app_context():
         print("🔄 Reiniciando base de datos...")
         db.drop_all()
         db.create_all()
@@ -0,0 +1,171 @@
+# seguridad.py
+"""Hashing de contraseñas fuera de los hilos de waitress y limitación de intentos de login."""
+
+import os
+import atexit
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout, wait
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# --- CONFIGURACIÓN ---
+# Formato Werkzeug "metodo:parametros". Si se cambia, los hashes antiguos se
+# regeneran automáticamente en el siguiente login exitoso de cada usuario.
+HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+HASH_MAX_PENDIENTES = int(os.getenv("HASH_MAX_PENDIENTES", HASH_WORKERS * 4))
+HASH_TIMEOUT = float(os.getenv("HASH_TIMEOUT", 10))
+# Nunca "fork": el proceso ya tiene hilos (waitress, monitor SLA, efectos) y un fork() copia sus
+# locks tomados, lo que puede dejar colgado al proceso hijo. Con forkserver/spawn los hijos importan
+# el script principal, que debe tener su `if __name__ == '__main__'` (run.py ya lo tiene)
+HASH_MP_CONTEXTO = os.getenv("HASH_MP_CONTEXTO", "forkserver")
+
+
+class ServidorOcupado(Exception):
+    """El pool de hashing está saturado o no respondió a tiempo."""
+
+
+# --- POOL DE PROCESOS (escapa del GIL) ---
+_pool = None
+_pool_lock = threading.Lock()
+_cupos = threading.BoundedSemaphore(max(1, HASH_MAX_PENDIENTES))
+
+
+def _contexto_mp():
+    """forkserver donde existe (Linux/macOS); spawn en el resto (Windows)."""
+    try:
+        contexto = multiprocessing.get_context(HASH_MP_CONTEXTO)
+    except ValueError:
+        return multiprocessing.get_context('spawn')
+    if HASH_MP_CONTEXTO == 'forkserver':
+        contexto.set_forkserver_preload(['werkzeug.security'])
+    return contexto
+
+
+def _obtener_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=_contexto_mp())
+        return _pool
+
+
+def precalentar_pool(timeout=HASH_TIMEOUT * 3):
+    """Arranca los procesos del pool antes del primer login (con spawn/forkserver tardan en partir)."""
+    if HASH_WORKERS <= 0:
+        return
+    # Sin procesos ociosos, cada submit arranca uno nuevo hasta llegar a HASH_WORKERS
+    wait([_obtener_pool().submit(os.getpid) for _ in range(HASH_WORKERS)], timeout=timeout)
+
+
+def _descartar_pool(roto=None):
+    """Cierra el pool. Con `roto`, solo si sigue siendo ese (otro hilo pudo haberlo reemplazado ya)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and (roto is None or _pool is roto):
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _enviar(fn, *args):
+    """submit al pool. Si un proceso murió estando ocioso (p. ej. OOM) el pool queda roto y submit
+    falla: se descarta y se reintenta una vez en un pool nuevo."""
+    pool = _obtener_pool()
+    try:
+        return pool.submit(fn, *args)
+    except BrokenProcessPool:
+        _descartar_pool(pool)
+        return _obtener_pool().submit(fn, *args)
+
+
+def _ejecutar(fn, *args):
+    """Ejecuta fn en el pool. Si ya hay demasiados trabajos en cola rechaza de inmediato."""
+    if HASH_WORKERS <= 0:  # Modo sin procesos (scripts, depuración)
+        return fn(*args)
+    if not _cupos.acquire(blocking=False):
+        raise ServidorOcupado("Demasiadas verificaciones de contraseña en cola.")
+    try:
+        futuro = _enviar(fn, *args)
+    except BrokenProcessPool:
+        _cupos.release()
+        _descartar_pool()
+        raise ServidorOcupado("El pool de hashing se reinició.")
+    except BaseException:
+        _cupos.release()
+        raise
+    # El cupo se libera cuando el proceso termina de verdad, no cuando el hilo deja de esperar
+    futuro.add_done_callback(lambda _: _cupos.release())
+    try:
+        return futuro.result(timeout=HASH_TIMEOUT)
+    except FuturesTimeout:
+        raise ServidorOcupado("La verificación de contraseña excedió el tiempo máximo.")
+    except BrokenProcessPool:
+        _descartar_pool()
+        raise ServidorOcupado("El pool de hashing se reinició.")
+
+
+def verificar_password(hash_guardado, password):
+    """Equivalente a check_password_hash, pero ejecutado en el pool de procesos."""
+    return _ejecutar(check_password_hash, hash_guardado, password)
+
+
+def generar_hash(password):
+    """Equivalente a generate_password_hash con los parámetros configurados."""
+    return _ejecutar(generate_password_hash, password, HASH_METHOD)
+
+
+def necesita_rehash(hash_guardado):
+    """True si el hash fue generado con parámetros distintos a HASH_METHOD."""
+    return hash_guardado.split('$', 1)[0] != HASH_METHOD
+
+
+atexit.register(_descartar_pool)
+
+
+# --- LIMITADOR DE INTENTOS (Token Bucket en memoria) ---
+class LimitadorIntentos:
+    """Token bucket por clave (RUT, IP). Cada intento consume un token; se recargan con el tiempo."""
+
+    def __init__(self, capacidad, segundos_por_token, max_claves=10000):
+        self.capacidad = capacidad
+        self.segundos_por_token = segundos_por_token
+        self.max_claves = max_claves
+        self._buckets = {}  # clave -> (tokens, ultimo_instante)
+        self._lock = threading.Lock()
+
+    def _recargar(self, clave, ahora):
+        tokens, ultimo = self._buckets.get(clave, (self.capacidad, ahora))
+        return min(self.capacidad, tokens + (ahora - ultimo) / self.segundos_por_token)
+
+    def consumir(self, clave):
+        """Devuelve True si el intento está permitido (y descuenta un token)."""
+        ahora = time.monotonic()
+        with self._lock:
+            tokens = self._recargar(clave, ahora)
+            permitido = tokens >= 1
+            self._buckets[clave] = (tokens - 1 if permitido else tokens, ahora)
+            if len(self._buckets) > self.max_claves:
+                self._purgar(ahora)
+            return permitido
+
+    def segundos_restantes(self, clave):
+        """Segundos hasta que la clave vuelva a tener un token disponible."""
+        with self._lock:
+            tokens = self._recargar(clave, time.monotonic())
+        return 0 if tokens >= 1 else int((1 - tokens) * self.segundos_por_token) + 1
+
+    def _purgar(self, ahora):
+        # Un bucket lleno es equivalente a no tener entrada: se puede olvidar
+        llenos = [c for c in self._buckets if self._recargar(c, ahora) >= self.capacidad]
+        for clave in llenos:
+            del self._buckets[clave]
+
+
+limitador_rut = LimitadorIntentos(
+    capacidad=int(os.getenv("LOGIN_MAX_INTENTOS_RUT", 5)),
+    segundos_por_token=float(os.getenv("LOGIN_RECARGA_RUT_SEG", 60)))
+limitador_ip = LimitadorIntentos(
+    capacidad=int(os.getenv("LOGIN_MAX_INTENTOS_IP", 20)),
+    segundos_por_token=float(os.getenv("LOGIN_RECARGA_IP_SEG", 6)))
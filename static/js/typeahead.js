@@ -0,0 +1,76 @@
+// typeahead.js
+// Selector de usuarios con búsqueda por prefijo (nombre, RUT o email) contra tecnico.buscar_usuarios_json.
+// Marcado esperado:
+//   <div class="typeahead position-relative" data-url="..." [data-requerido]>
+//     <input type="text" class="form-control typeahead-texto">
+//     <input type="hidden" name="..." class="typeahead-valor">
+//     <div class="list-group typeahead-lista"></div>
+//   </div>
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('.typeahead').forEach(function (caja) {
+        var texto = caja.querySelector('.typeahead-texto');
+        var valor = caja.querySelector('.typeahead-valor');
+        var lista = caja.querySelector('.typeahead-lista');
+        var espera = null, consulta = 0;
+
+        function cerrar() { lista.classList.add('d-none'); lista.innerHTML = ''; }
+
+        function mostrar(usuarios) {
+            lista.innerHTML = '';
+            if (!usuarios.length) {
+                var vacio = document.createElement('div');
+                vacio.className = 'list-group-item text-muted small';
+                vacio.textContent = 'Sin resultados';
+                lista.appendChild(vacio);
+            }
+            usuarios.forEach(function (u) {
+                var item = document.createElement('button');
+                item.type = 'button';
+                item.className = 'list-group-item list-group-item-action';
+                item.innerHTML = '<div></div><small class="text-muted"></small>';
+                item.querySelector('div').textContent = u.nombre;
+                item.querySelector('small').textContent = u.rut + ' · ' + u.email + ' · ' + u.rol;
+                // mousedown en vez de click: se adelanta al blur del input
+                item.addEventListener('mousedown', function (e) {
+                    e.preventDefault();
+                    texto.value = u.nombre;
+                    valor.value = u.id;
+                    texto.classList.remove('is-invalid');
+                    cerrar();
+                });
+                lista.appendChild(item);
+            });
+            lista.classList.remove('d-none');
+        }
+
+        function buscar() {
+            var url = new URL(caja.dataset.url, window.location.origin);
+            url.searchParams.set('q', texto.value.trim());
+            var numero = ++consulta;
+            fetch(url)
+                .then(function (r) { return r.json(); })
+                .then(function (data) { if (numero === consulta) mostrar(data.usuarios); })
+                .catch(cerrar);
+        }
+
+        texto.addEventListener('input', function () {
+            valor.value = '';  // Lo escrito ya no corresponde al usuario elegido antes
+            clearTimeout(espera);
+            espera = setTimeout(buscar, 200);
+        });
+        texto.addEventListener('focus', buscar);
+        texto.addEventListener('blur', cerrar);
+        texto.addEventListener('keydown', function (e) { if (e.key === 'Escape') cerrar(); });
+
+        var form = caja.closest('form');
+        if (form) {
+            form.addEventListener('submit', function (e) {
+                // Texto escrito sin elegir una opción (o campo requerido vacío): no se envía
+                if (!valor.value && (texto.value.trim() || caja.hasAttribute('data-requerido'))) {
+                    e.preventDefault();
+                    texto.classList.add('is-invalid');
+                }
+            });
+        }
+    });
+});
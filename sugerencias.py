@@ -0,0 +1,258 @@
+# sugerencias.py
+"""Sugerencias de FAQ y posibles duplicados mientras el usuario escribe el asunto de un ticket.
+
+Mantiene en memoria un índice TF-IDF (matrices dispersas de SciPy) sobre los artículos de FAQ y
+los tickets abiertos. Los tickets cerrados recientes solo aportan al vocabulario y a las
+frecuencias de documento. El índice se construye en la primera consulta, se actualiza por
+documento con los efectos post-commit (indexar_articulo / indexar_ticket) y se reconstruye
+completo cada SUGERENCIAS_TTL segundos para recoger cambios de otros procesos.
+"""
+
+import os
+import re
+import time
+import threading
+import unicodedata
+import numpy as np
+from scipy import sparse
+from modelos import db, Articulo, Ticket
+from contenido import procesar_html
+
+# --- CONFIGURACIÓN ---
+TTL_SEG = int(os.getenv("SUGERENCIAS_TTL", 900))
+MAX_CERRADOS = int(os.getenv("SUGERENCIAS_MAX_CERRADOS", 5000))
+UMBRAL = float(os.getenv("SUGERENCIAS_UMBRAL", 0.15))
+LONGITUD_RAIZ = 6  # Truncado simple: "contraseña"/"contraseñas" -> "contra"
+PALABRAS_VACIAS = {
+    'con', 'del', 'las', 'los', 'una', 'uno', 'unos', 'unas', 'por', 'para', 'que', 'como',
+    'mas', 'pero', 'sus', 'mis', 'tus', 'este', 'esta', 'esto', 'ese', 'esa', 'eso', 'hay', 'muy',
+    'sin', 'sobre', 'entre', 'cuando', 'donde', 'tengo', 'tiene', 'puedo', 'puede', 'hola', 'favor',
+    'porque', 'desde', 'hasta', 'todo', 'todos', 'nos', 'les', 'ellos', 'ella',
+}
+_PALABRA = re.compile(r'[a-z0-9ñ]{3,}')
+
+
+def terminos(texto):
+    """Raíces normalizadas (minúsculas, sin tildes, sin palabras vacías) de un texto plano."""
+    texto = unicodedata.normalize('NFKD', (texto or '').lower().replace('ñ', '\0'))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).replace('\0', 'ñ')
+    return [p[:LONGITUD_RAIZ] for p in _PALABRA.findall(texto) if p not in PALABRAS_VACIAS]
+
+
+def _texto_articulo(articulo):
+    # El título pesa el doble: es lo más parecido a un asunto de ticket
+    return f"{articulo.titulo} {articulo.titulo} {procesar_html(articulo.contenido)[1]}"
+
+
+def _texto_ticket(asunto, descripcion_texto):
+    return f"{asunto} {asunto} {descripcion_texto or ''}"
+
+
+class _Coleccion:
+    """Vectores TF-IDF normalizados por id, con la matriz CSR armada solo cuando cambió algo."""
+
+    def __init__(self):
+        self.vectores = {}  # id -> (columnas, pesos)
+        self.datos = {}     # id -> lo que se devuelve en el JSON
+        self._matriz = None
+
+    def poner(self, doc_id, vector, datos):
+        self.vectores[doc_id] = vector
+        self.datos[doc_id] = datos
+        self._matriz = None
+
+    def quitar(self, doc_id):
+        if self.vectores.pop(doc_id, None) is not None:
+            self.datos.pop(doc_id, None)
+            self._matriz = None
+
+    def matriz(self, columnas):
+        if self._matriz is None or self._matriz[0].shape[1] != columnas:
+            ids = np.fromiter(self.vectores.keys(), dtype=np.int64, count=len(self.vectores))
+            vectores = list(self.vectores.values())
+            indptr = np.zeros(len(vectores) + 1, dtype=np.int64)
+            np.cumsum([len(c) for c, _ in vectores], out=indptr[1:])
+            cols = np.concatenate([c for c, _ in vectores]) if vectores else np.zeros(0, dtype=np.int32)
+            pesos = np.concatenate([p for _, p in vectores]) if vectores else np.zeros(0)
+            self._matriz = (sparse.csr_matrix((pesos, cols, indptr), shape=(len(vectores), columnas)), ids)
+        return self._matriz
+
+
+class IndiceSugerencias:
+    def __init__(self):
+        self.vocabulario = {}  # raíz -> columna
+        self.df = []           # frecuencia de documento por columna
+        self.total_docs = 0
+        self.articulos = _Coleccion()
+        self.abiertos = _Coleccion()
+        self.construido = time.monotonic()
+
+    def _idf(self, columna):
+        return np.log((1 + self.total_docs) / (1 + self.df[columna])) + 1
+
+    def _contar(self, raices):
+        for raiz in set(raices):
+            columna = self.vocabulario.setdefault(raiz, len(self.vocabulario))
+            if columna == len(self.df):
+                self.df.append(0)
+            self.df[columna] += 1
+        self.total_docs += 1
+
+    def vectorizar(self, texto, agregar=False):
+        """Vector TF-IDF normalizado (columnas, pesos). Con agregar=False ignora raíces desconocidas."""
+        frecuencias = {}
+        for raiz in terminos(texto):
+            columna = self.vocabulario.get(raiz)
+            if columna is None and agregar:
+                columna = self.vocabulario[raiz] = len(self.vocabulario)
+                self.df.append(1)  # Raíz nueva: peso máximo hasta la próxima reconstrucción
+            if columna is not None:
+                frecuencias[columna] = frecuencias.get(columna, 0) + 1
+        columnas = np.fromiter(frecuencias.keys(), dtype=np.int32, count=len(frecuencias))
+        pesos = np.array([(1 + np.log(tf)) * self._idf(c) for c, tf in frecuencias.items()])
+        norma = np.linalg.norm(pesos)
+        return columnas, (pesos / norma if norma else pesos)
+
+    @classmethod
+    def construir(cls):
+        indice = cls()
+        articulos = Articulo.query.all()
+        abiertos = db.session.query(Ticket.id, Ticket.asunto, Ticket.descripcion_texto, Ticket.usuario_id, Ticket.estado).filter(Ticket.estado != 'Cerrado').all()
+        cerrados = (db.session.query(Ticket.asunto, Ticket.descripcion_texto).filter(Ticket.estado == 'Cerrado')
+                    .order_by(Ticket.id.desc()).limit(MAX_CERRADOS).all())
+        textos_articulos = [(a, _texto_articulo(a)) for a in articulos]
+        textos_abiertos = [(t, _texto_ticket(t.asunto, t.descripcion_texto)) for t in abiertos]
+        # Primero las frecuencias de documento de todo el corpus, después los vectores
+        for _, texto in textos_articulos + textos_abiertos:
+            indice._contar(terminos(texto))
+        for asunto, descripcion in cerrados:
+            indice._contar(terminos(_texto_ticket(asunto, descripcion)))
+        for articulo, texto in textos_articulos:
+            indice.poner_articulo(articulo, texto)
+        for ticket, texto in textos_abiertos:
+            indice.poner_ticket(ticket, texto)
+        return indice
+
+    def poner_articulo(self, articulo, texto=None):
+        vector = self.vectorizar(texto or _texto_articulo(articulo), agregar=True)
+        self.articulos.poner(articulo.id, vector, {'id': articulo.id, 'titulo': articulo.titulo, 'categoria_faq': articulo.categoria_faq})
+
+    def poner_ticket(self, ticket, texto=None):
+        if ticket.estado == 'Cerrado':
+            self.abiertos.quitar(ticket.id)
+            return
+        vector = self.vectorizar(texto or _texto_ticket(ticket.asunto, ticket.descripcion_texto), agregar=True)
+        self.abiertos.poner(ticket.id, vector, {'id': ticket.id, 'asunto': ticket.asunto, 'estado': ticket.estado, 'usuario_id': ticket.usuario_id})
+
+    def _mejores(self, coleccion, consulta, k):
+        matriz, ids = coleccion.matriz(len(self.vocabulario))
+        if not len(ids):
+            return []
+        puntajes = matriz @ consulta
+        candidatos = np.flatnonzero(puntajes >= UMBRAL)
+        if len(candidatos) > k:
+            candidatos = candidatos[np.argpartition(-puntajes[candidatos], k - 1)[:k]]
+        candidatos = candidatos[np.argsort(-puntajes[candidatos])]
+        return [(coleccion.datos[int(ids[i])], float(puntajes[i])) for i in candidatos]
+
+    def buscar(self, texto, k=5):
+        """(artículos, tickets abiertos) más parecidos a `texto`, como listas de (datos, puntaje)."""
+        columnas, pesos = self.vectorizar(texto)
+        if not len(columnas):
+            return [], []
+        consulta = np.zeros(len(self.vocabulario))
+        consulta[columnas] = pesos
+        return self._mejores(self.articulos, consulta, k), self._mejores(self.abiertos, consulta, k)
+
+
+# --- ÍNDICE DEL PROCESO ---
+_indice = None
+_pendientes = None  # Mientras se construye un índice: cambios [(tipo, id)] a repetir sobre él antes de publicarlo
+_lock = threading.Lock()               # Protege lecturas y cambios del índice vigente (y _pendientes)
+_lock_construccion = threading.Lock()  # Una sola reconstrucción a la vez; las consultas no esperan
+
+
+def _vencido(indice):
+    return indice is None or time.monotonic() - indice.construido > TTL_SEG
+
+
+def _reconstruir():
+    """Construye un índice nuevo y lo publica con los cambios que llegaron durante la construcción."""
+    global _indice, _pendientes
+    with _lock:
+        _pendientes = []
+    try:
+        nuevo = IndiceSugerencias.construir()
+        while True:
+            with _lock:
+                cambios, _pendientes = _pendientes, []
+                if not cambios:
+                    # Desde aquí indexar_* aplica directo sobre el índice nuevo
+                    _indice, _pendientes = nuevo, None
+                    return
+            for tipo, doc_id in cambios:
+                _aplicar(nuevo, tipo, doc_id)
+    except BaseException:
+        with _lock:
+            _pendientes = None
+        raise
+
+
+def obtener_indice():
+    """Índice vigente; lo (re)construye si no existe o venció el TTL. Requiere app context."""
+    if _vencido(_indice):
+        if _indice is None:
+            _lock_construccion.acquire()  # Sin índice previo no hay nada que responder mientras tanto
+        elif not _lock_construccion.acquire(blocking=False):
+            return _indice  # Otro hilo ya lo está reconstruyendo: se sigue usando el anterior
+        try:
+            if _vencido(_indice):
+                _reconstruir()
+        finally:
+            _lock_construccion.release()
+    return _indice
+
+
+def sugerir(texto, k=5):
+    indice = obtener_indice()
+    with _lock:
+        return indice.buscar(texto, k)
+
+
+# --- ACTUALIZACIÓN INCREMENTAL (efectos post-commit, ver efectos.py) ---
+def _aplicar(indice, tipo, doc_id):
+    # populate_existing: la sesión puede tener el objeto cargado de antes del cambio
+    if tipo == 'articulo':
+        articulo = db.session.get(Articulo, doc_id, populate_existing=True)
+        with _lock:
+            if articulo is None:
+                indice.articulos.quitar(doc_id)
+            else:
+                indice.poner_articulo(articulo)
+    else:
+        ticket = db.session.get(Ticket, doc_id, populate_existing=True)
+        with _lock:
+            if ticket is None:
+                indice.abiertos.quitar(doc_id)
+            else:
+                indice.poner_ticket(ticket)
+
+
+def _registrar(tipo, doc_id):
+    """Aplica el cambio al índice vigente y, si hay una construcción en curso, lo anota para repetirlo."""
+    with _lock:
+        if _pendientes is not None:
+            _pendientes.append((tipo, doc_id))
+        indice = _indice
+    if indice is not None:  # Sin índice ni construcción: se indexará completo en la primera consulta
+        _aplicar(indice, tipo, doc_id)
+
+
+def indexar_articulo(articulo_id):
+    """Vuelve a indexar un artículo creado o editado; si ya no existe, lo quita."""
+    _registrar('articulo', articulo_id)
+
+
+def indexar_ticket(ticket_id):
+    """Agrega un ticket abierto al índice de duplicados o lo quita si se cerró o ya no existe."""
+    _registrar('ticket', ticket_id)
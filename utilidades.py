@@ -0,0 +1,186 @@
+# utilidades.py
+"""Decoradores, auditoría, cálculo de SLA y asignación Round Robin compartidos por los blueprints."""
+
+import os
+import time
+import threading
+from functools import wraps
+from datetime import datetime, timedelta
+from flask import session, redirect, url_for, flash, g
+from modelos import db, Usuario, Ticket, Notificacion, LogAuditoria
+from efectos import encolar_efecto
+
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'txt', 'xlsx', 'docx'}
+
+# --- CACHÉ DE FERIADOS (Para no saturar la API) ---
+FERIADOS_API_URL = os.getenv("FERIADOS_API_URL", "https://apis.digital.gob.cl/fl/feriados/{anio}")
+FERIADOS_TIMEOUT = float(os.getenv("FERIADOS_TIMEOUT", 5))
+FERIADOS_REINTENTO_SEG = int(os.getenv("FERIADOS_REINTENTO", 600))  # Caché negativa: no reintentar antes
+FERIADOS_CACHE = {}  # anio -> (expira en time.monotonic() o None si es definitivo, fechas)
+_feriados_lock = threading.Lock()
+
+def obtener_feriados(anio):
+    """Consulta la API de Gobierno Digital y guarda los feriados en memoria.
+
+    Si la API falla se guarda una lista vacía por FERIADOS_REINTENTO_SEG segundos, para que una
+    API caída no cueste un timeout en cada request.
+    """
+    guardado = FERIADOS_CACHE.get(anio)
+    if guardado and (guardado[0] is None or guardado[0] > time.monotonic()):
+        return guardado[1]
+
+    with _feriados_lock:  # Un solo hilo consulta; los demás esperan su resultado
+        guardado = FERIADOS_CACHE.get(anio)
+        if guardado and (guardado[0] is None or guardado[0] > time.monotonic()):
+            return guardado[1]
+        try:
+            import requests  # Solo se carga al consultar la API, no al arrancar cada worker
+            response = requests.get(FERIADOS_API_URL.format(anio=anio), headers={'User-Agent': 'Ticketera-Tesis-v1.0'},
+                                    timeout=FERIADOS_TIMEOUT)
+            if response.status_code == 200:
+                # Guardamos solo las fechas como strings 'YYYY-MM-DD'
+                feriados = frozenset(item['fecha'] for item in response.json())
+                FERIADOS_CACHE[anio] = (None, feriados)
+                print(f"✅ Feriados {anio} cargados desde API: {len(feriados)} días.")
+                return feriados
+            print(f"⚠️ API Feriados respondió {response.status_code}")
+        except Exception as e:
+            print(f"⚠️ Error consultando API Feriados: {e}")
+        FERIADOS_CACHE[anio] = (time.monotonic() + FERIADOS_REINTENTO_SEG, frozenset())
+        return FERIADOS_CACHE[anio][1]
+
+def precargar_feriados(anios=None):
+    """Carga en segundo plano los feriados del año actual y el siguiente, fuera de los requests."""
+    anio = datetime.utcnow().year
+    anios = anios or (anio, anio + 1)
+    hilo = threading.Thread(target=lambda: [obtener_feriados(a) for a in anios], name="precarga-feriados", daemon=True)
+    hilo.start()
+    return hilo
+
+def es_dia_habil(fecha, feriados=None):
+    """Devuelve False si es Sábado, Domingo o Feriado. `feriados` evita volver a buscar los del año."""
+    # 1. Fin de semana (Saturday=5, Sunday=6)
+    if fecha.weekday() >= 5:
+        return False
+    
+    # 2. Feriado API
+    if feriados is None:
+        feriados = obtener_feriados(fecha.year)
+    return fecha.strftime('%Y-%m-%d') not in feriados
+
+def calcular_vencimiento_realista(horas_sla):
+    """Suma horas al tiempo actual saltándose fines de semana y feriados."""
+    fecha_actual = datetime.utcnow() # Ojo: Idealmente usar hora local de Chile
+    horas_restantes = horas_sla
+    feriados = {}  # Un cálculo consulta la caché una vez por año, no una vez por hora
+
+    def habil(fecha):
+        if fecha.year not in feriados:
+            feriados[fecha.year] = obtener_feriados(fecha.year)
+        return es_dia_habil(fecha, feriados[fecha.year])
+    
+    while horas_restantes > 0:
+        fecha_actual += timedelta(hours=1)
+        # Si al sumar 1 hora caemos en un día NO hábil, avanzamos hasta el siguiente día hábil a las 9 AM
+        if not habil(fecha_actual):
+            # Avanzamos de a 1 día hasta encontrar un hábil
+            while not habil(fecha_actual):
+                fecha_actual += timedelta(days=1)
+            # Reseteamos a inicio de jornada (opcional, simplificado aquí solo saltamos días)
+        
+        horas_restantes -= 1
+        
+    return fecha_actual
+
+# --- FUNCIONES Y DECORADORES ---
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'usuario_id' not in session:
+            flash('Debes iniciar sesión para ver esta página.', 'warning')
+            return redirect(url_for('principal.index'))
+        usuario = usuario_actual()
+        if usuario is None or usuario.eliminado:
+            # Cookie de un usuario eliminado (borrado lógico o ya purgado): la sesión deja de valer
+            session.clear()
+            g.pop('usuario_actual', None)
+            flash('Tu cuenta ya no está activa. Inicia sesión nuevamente.', 'warning')
+            return redirect(url_for('principal.index'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def role_required(roles):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if session.get('rol') not in roles:
+                flash('No tienes permiso para acceder a esta página.', 'danger')
+                return redirect(url_for('tecnico.tecnico_dashboard'))
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def usuario_actual():
+    """Usuario logueado, cargado una sola vez por request y memorizado en flask.g."""
+    if 'usuario_actual' not in g:
+        g.usuario_actual = db.session.get(Usuario, session['usuario_id']) if 'usuario_id' in session else None
+    return g.usuario_actual
+
+def registrar_log(accion, detalles):
+    try:
+        user_id = session.get('usuario_id')
+        user_nombre = session.get('usuario_nombre', 'Sistema')
+        nuevo_log = LogAuditoria(
+            usuario_id=user_id,
+            usuario_nombre_backup=user_nombre,
+            accion=accion,
+            detalles=detalles
+        )
+        db.session.add(nuevo_log)
+    except Exception as e:
+        print(f"Error registrando log: {e}")
+
+# --- EFECTOS POST-COMMIT (se ejecutan en segundo plano, ver efectos.py) ---
+def efecto_log(usuario_id, usuario_nombre, accion, detalles):
+    db.session.add(LogAuditoria(usuario_id=usuario_id, usuario_nombre_backup=usuario_nombre, accion=accion, detalles=detalles))
+
+def registrar_log_diferido(accion, detalles):
+    """Como registrar_log, pero el insert ocurre después del commit del request."""
+    encolar_efecto(efecto_log, session.get('usuario_id'), session.get('usuario_nombre', 'Sistema'), accion, detalles)
+
+def efecto_asignar_tecnico(ticket_id):
+    """Asigna por Round Robin y notifica al técnico. Idempotente: no toca tickets ya asignados."""
+    ticket = db.session.get(Ticket, ticket_id)
+    if ticket is None or ticket.tecnico_id:
+        return
+    ticket.tecnico_id = get_next_technician_id()
+    if ticket.tecnico_id:
+        db.session.add(Notificacion(mensaje=f"Se te ha asignado un nuevo ticket: #{ticket.id}.", usuario_id=ticket.tecnico_id, ticket_id=ticket.id))
+
+# --- CONTEXTO DE PLANTILLAS Y ROUND ROBIN ---
+def inject_global_vars():
+    unread_count = 0
+    if 'usuario_id' in session and session['rol'] == 'Usuario':
+        unread_count = Notificacion.query.filter_by(usuario_id=session['usuario_id'], leida=False).count()
+    return dict(unread_notifications=unread_count, now=datetime.utcnow())
+
+LAST_INDEX_FILE = 'last_technician_index.txt'
+_round_robin_lock = threading.Lock()  # Los efectos en segundo plano pueden asignar en paralelo
+
+def get_next_technician_id():
+    tecnicos_n1 = [t.id for t in db.session.query(Usuario.id).filter_by(rol='Técnico Nivel 1', eliminado=False).order_by(Usuario.id)]
+    if not tecnicos_n1:
+        return None
+    with _round_robin_lock:
+        try:
+            with open(LAST_INDEX_FILE, 'r') as f:
+                last_index = int(f.read())
+        except (FileNotFoundError, ValueError):
+            last_index = -1
+        next_index = (last_index + 1) % len(tecnicos_n1)
+        with open(LAST_INDEX_FILE, 'w') as f:
+            f.write(str(next_index))
+    return tecnicos_n1[next_index]
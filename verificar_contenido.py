@@ -0,0 +1,50 @@
+# verificar_contenido.py
+"""Casos de la sanitización de contenido.py (HTML malicioso o mal formado).
+
+Uso: python verificar_contenido.py
+Termina con código 1 si algún caso no da el resultado esperado.
+"""
+
+import sys
+from contenido import procesar_html
+
+# (entrada, html esperado, texto esperado)
+CASOS = [
+    ('<p>a</p><script>alert(1)</script><p>b</p>', '<p>a</p><p>b</p>', 'a\nb'),
+    # Etiquetas descartadas auto-cerradas: no deben comerse lo que viene después
+    ('<p>a</p><script/><p>b</p>', '<p>a</p><p>b</p>', 'a\nb'),
+    ('<p>a<iframe/>b</p><p>c</p>', '<p>ab</p><p>c</p>', 'ab\nc'),
+    ('<svg/><p>x</p>', '<p>x</p>', 'x'),
+    ('<p onclick="x()">hola</p>', '<p>hola</p>', 'hola'),
+    ('<a href="javascript:alert(1)">x</a>', '<a>x</a>', 'x'),
+    ('<a href=" JaVa\tscript:alert(1)">x</a>', '<a>x</a>', 'x'),
+    ('<a href="https://ejemplo.cl" target="_blank">x</a>',
+     '<a href="https://ejemplo.cl" target="_blank" rel="noopener noreferrer">x</a>', 'x'),
+    ('<img src="data:text/html;base64,PHNjcmlwdD4=">', '<img>', ''),
+    ('<b><i>sin cerrar', '<b><i>sin cerrar</i></b>', 'sin cerrar'),
+    ('1 &lt; 2 <br> fin', '1 &lt; 2 <br> fin', '1 < 2\nfin'),
+    # CSS: solo valores simples y rgb()/rgba()
+    ('<span style="width: expression(alert(1))">x</span>', '<span>x</span>', 'x'),
+    ('<span style="color: rgb(255, 0, 0)">x</span>', '<span style="color: rgb(255, 0, 0)">x</span>', 'x'),
+    ('<span style="color: rgba(0,0,0,0.5); background-color: url(x)">x</span>', '<span style="color: rgba(0,0,0,0.5)">x</span>', 'x'),
+    ('<span style="width: calc(100% - 1px)">x</span>', '<span>x</span>', 'x'),
+    ('', '', ''),
+]
+
+
+def run_verificacion():
+    fallas = 0
+    for entrada, html, texto in CASOS:
+        resultado = procesar_html(entrada)
+        if resultado != (html, texto):
+            fallas += 1
+            print(f"❌ {entrada!r}\n   esperado: {(html, texto)!r}\n   obtenido: {resultado!r}")
+    if fallas:
+        print(f"⚠️ {fallas} de {len(CASOS)} casos fallaron.")
+        return False
+    print(f"✅ {len(CASOS)} casos de sanitización correctos.")
+    return True
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run_verificacion() else 1)